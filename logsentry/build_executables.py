@@ -7,13 +7,80 @@ Automated script to build Windows executables for LogSentry using PyInstaller.
 Creates both CLI and Web interface executables with all dependencies bundled.
 """
 
+import argparse
+import hashlib
+import importlib.util
+import json
 import os
+import site
 import sys
-import shutil
 import subprocess
+import sysconfig
+import tempfile
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# PyInstaller work directory, kept outside build/ so it survives cleaning
+PYINSTALLER_CACHE = os.path.expanduser('~/.logsentry-pyinstaller-cache')
+
+# Records a successful dependency check so repeat builds can skip it
+DEPENDENCY_CACHE = Path('.logsentry-build-cache.json')
+
+# Environment for PyInstaller runs, built once. Not writing bytecode keeps the
+# tree free of .pyc files that the next clean would have to delete.
+_BUILD_ENV = {
+    **os.environ,
+    'PYTHONDONTWRITEBYTECODE': '1',
+    'PYTHONUNBUFFERED': '1',
+}
+
+# Usage instructions shipped as USAGE.txt in the release package. Encoded once
+# at import with the platform's line endings, as text-mode writing would do.
+_USAGE_TEXT = """LogSentry Security Log Analyzer - Standalone Executables
+Created by Anthony Frederick, 2025
+
+USAGE INSTRUCTIONS:
+
+1. CLI Interface:
+   - Run: LogSentry-CLI.exe --help
+   - Example: LogSentry-CLI.exe analyze logfile.txt
+   - Example: LogSentry-CLI.exe scan C:\\logs --pattern "*.log"
+
+2. Web Interface:
+   - Run: LogSentry-Web.exe
+   - Open browser to: http://localhost:5000
+   - Upload log files via web interface
+   - View interactive charts and results
+
+3. Command Line Options:
+   - LogSentry-CLI.exe analyze [file] --verbose --severity high
+   - LogSentry-Web.exe --port 8080 --no-browser
+
+4. Supported Log Formats:
+   - Apache/Nginx access logs
+   - Windows Event Logs
+   - Syslog files
+   - Firewall logs
+   - JSON logs
+   - CSV files
+   - Compressed (.gz) files
+
+5. Security Features:
+   - SQL injection detection
+   - XSS attack detection
+   - Directory traversal detection
+   - Brute force detection
+   - Privilege escalation detection
+   - And many more...
+
+For full documentation, see README.md and WEB_INTERFACE.md
+
+Created by Anthony Frederick, 2025
+"""
+_USAGE_BYTES = _USAGE_TEXT.replace('\n', os.linesep).encode('utf-8')
+
 def print_header():
     """Print the build script header"""
     print("🛡️  LogSentry Executable Builder")
@@ -21,10 +88,58 @@ def print_header():
     print("=" * 50)
     print()
 
+def _dependency_cache_key():
+    """Identify the current interpreter/environment for the dependency cache"""
+    return hashlib.blake2b((sys.prefix + sys.version).encode()).hexdigest()
+
+def _site_packages_mtime():
+    """Return the newest install/uninstall time across site-packages"""
+    paths = {sysconfig.get_paths()['purelib'], sysconfig.get_paths()['platlib']}
+    user_site = site.getusersitepackages()
+    if isinstance(user_site, str):
+        paths.add(user_site)
+    
+    newest = 0.0
+    for path in paths:
+        try:
+            # The directory itself changes whenever a dist-info is added or removed
+            newest = max(newest, os.stat(path).st_mtime)
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.endswith('.dist-info'):
+                        newest = max(newest, entry.stat().st_mtime)
+        except OSError:
+            continue
+    return newest
+
+def _dependency_cache_is_fresh():
+    """Check whether a previous successful dependency check still applies"""
+    try:
+        with open(DEPENDENCY_CACHE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        cache.get('key') == _dependency_cache_key()
+        and cache.get('mtime', 0) >= _site_packages_mtime()
+    )
+
+def _write_dependency_cache():
+    """Record a successful dependency check for this environment"""
+    try:
+        with open(DEPENDENCY_CACHE, 'w') as f:
+            json.dump({'key': _dependency_cache_key(), 'mtime': time.time()}, f)
+    except OSError:
+        pass
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     print("🔍 Checking dependencies...")
     
+    if _dependency_cache_is_fresh():
+        print("✅ All dependencies found (cached)")
+        return True
+    
     required_packages = [
         'pyinstaller',
         'flask',
@@ -47,10 +162,15 @@ def check_dependencies():
     
     for package in required_packages:
         import_name = package_map.get(package, package.replace('-', '_'))
+        # find_spec only locates the package, without running its import side effects
         try:
-            __import__(import_name)
+            found = importlib.util.find_spec(import_name) is not None
+        except (ImportError, ValueError):
+            found = False
+        
+        if found:
             print(f"   ✅ {package}")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"   ❌ {package}")
     
@@ -61,8 +181,46 @@ def check_dependencies():
         return False
     
     print("✅ All dependencies found")
+    _write_dependency_cache()
     return True
 
+def _walk_files(path):
+    """Recursively yield file DirEntry objects, reusing scandir's cached type info"""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+def _unlink_quietly(path):
+    """Remove a file, ignoring files that are already gone or locked"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def fast_rmtree(path, max_workers=8):
+    """Remove a directory tree, deleting each directory's files in parallel
+    
+    Walks with os.scandir so the cached entry type is reused instead of
+    re-stat'ing every path, then removes directories bottom-up.
+    """
+    def _remove(dir_path, executor):
+        files = []
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    _remove(entry.path, executor)
+                else:
+                    files.append(entry.path)
+        # Consume the results so the first failure propagates like shutil.rmtree
+        list(executor.map(os.unlink, files))
+        os.rmdir(dir_path)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        _remove(path, executor)
+
 def clean_build_directories():
     """Clean previous build directories"""
     print("\n🧹 Cleaning previous builds...")
@@ -72,44 +230,75 @@ def clean_build_directories():
     for dir_name in dirs_to_clean:
         if os.path.exists(dir_name):
             try:
-                shutil.rmtree(dir_name)
+                fast_rmtree(dir_name)
                 print(f"   🗑️  Removed {dir_name}/")
             except Exception as e:
                 print(f"   ⚠️  Could not remove {dir_name}/: {e}")
     
-    # Clean .pyc files
-    for root, dirs, files in os.walk('.'):
-        for file in files:
-            if file.endswith('.pyc'):
-                try:
-                    os.remove(os.path.join(root, file))
-                except:
-                    pass
+    # Clean .pyc files; unlink is pure syscall latency, so overlap it on threads
+    pyc_paths = [entry.path for entry in _walk_files('.') if entry.name.endswith('.pyc')]
+    if pyc_paths:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_unlink_quietly, pyc_paths))
     
     print("✅ Build directories cleaned")
 
-def build_executable(spec_file, executable_name):
-    """Build an executable using PyInstaller"""
+def _pyinstaller_command():
+    """Return the argv prefix used to invoke PyInstaller
+    
+    PyInstaller bundles the interpreter it runs under, so setting
+    LOGSENTRY_BUILD_PYTHON to a PGO/LTO-optimized Python (e.g. one built with
+    PCbuild\\build_pgo.bat or the python.org installers) ships that faster
+    interpreter inside the executables. It must have PyInstaller installed.
+    """
+    python_exe = os.environ.get('LOGSENTRY_BUILD_PYTHON')
+    if python_exe:
+        return [python_exe, '-m', 'PyInstaller']
+    return ['pyinstaller']
+
+def _launch(spec_file, executable_name):
+    """Start a PyInstaller build in the background and return its process handle"""
     print(f"\n🔨 Building {executable_name}...")
     print(f"   Spec file: {spec_file}")
     
-    start_time = time.time()
+    # Keep PyInstaller's analysis cache outside build/ so incremental builds
+    # can reuse it. Builds run side by side, so each gets its own work and
+    # config directory; a forced build wipes PYINSTALLER_CACHE once up front
+    # rather than passing --clean, which would clear the other build's cache.
+    build_cache = os.path.join(PYINSTALLER_CACHE, executable_name)
+    cmd = _pyinstaller_command() + [
+        '--noconfirm',
+        '--workpath', build_cache,
+        '--distpath', 'dist',
+        spec_file,
+    ]
+    if os.environ.get('UPX_DIR'):
+        # Point PyInstaller at a UPX install that isn't on PATH
+        cmd[-1:-1] = ['--upx-dir', os.environ['UPX_DIR']]
+    print(f"   Command: {' '.join(cmd)}")
     
+    # PyInstaller logs heavily to stderr; spool it to a temp file rather than a
+    # pipe so a build never stalls on a full pipe while another is awaited
+    log_file = tempfile.TemporaryFile(mode='w+')
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=log_file,
+        text=True,
+        env={**_BUILD_ENV, 'PYINSTALLER_CONFIG_DIR': os.path.join(build_cache, 'config')}
+    )
+    process.log_file = log_file
+    return process
+
+def _finish(process, executable_name, start_time):
+    """Wait for a PyInstaller build to finish and report the result"""
     try:
-        # Run PyInstaller
-        cmd = ['pyinstaller', '--clean', '--noconfirm', spec_file]
-        print(f"   Command: {' '.join(cmd)}")
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
+        process.wait(timeout=300)  # 5 minute timeout
         
         build_time = time.time() - start_time
         
-        if result.returncode == 0:
+        if process.returncode == 0:
             print(f"   ✅ {executable_name} built successfully in {build_time:.1f}s")
             
             # Check if executable exists (Linux has no extension, Windows has .exe)
@@ -133,103 +322,84 @@ def build_executable(spec_file, executable_name):
                 return False
         else:
             print(f"   ❌ Build failed for {executable_name}")
-            print(f"   Error output: {result.stderr}")
+            process.log_file.seek(0)
+            print(f"   Error output: {process.log_file.read()}")
             return False
             
     except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
         print(f"   ❌ Build timed out for {executable_name}")
         return False
     except Exception as e:
         print(f"   ❌ Build error for {executable_name}: {e}")
         return False
+    finally:
+        process.log_file.close()
+
+def build_executable(spec_file, executable_name):
+    """Build an executable using PyInstaller"""
+    start_time = time.time()
+    try:
+        process = _launch(spec_file, executable_name)
+    except Exception as e:
+        print(f"   ❌ Build error for {executable_name}: {e}")
+        return False
+    return _finish(process, executable_name, start_time)
 
 def create_release_package():
-    """Create a release package with both executables"""
+    """Create a release archive with both executables and the documentation"""
     print("\n📦 Creating release package...")
     
-    release_dir = Path('dist/LogSentry-Release')
-    release_dir.mkdir(exist_ok=True)
-    
-    # Copy executables
-    exe_files = list(Path('dist').glob('*.exe'))
-    for exe_file in exe_files:
-        if exe_file.name not in ['LogSentry-CLI.exe', 'LogSentry-Web.exe']:
-            continue
-        
-        dest = release_dir / exe_file.name
-        try:
-            shutil.copy2(exe_file, dest)
-            print(f"   ✅ Copied {exe_file.name}")
-        except Exception as e:
-            print(f"   ❌ Failed to copy {exe_file.name}: {e}")
+    # Write everything straight into the distributable archive in one pass
+    # rather than copying files into a staging directory first
+    release_zip = Path('dist/LogSentry-Release.zip')
     
-    # Copy documentation
-    doc_files = ['README.md', 'WEB_INTERFACE.md', 'INSTALLATION.md', 'LICENSE']
-    for doc_file in doc_files:
-        if os.path.exists(doc_file):
+    with zipfile.ZipFile(release_zip, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        # Add executables
+        exe_files = list(Path('dist').glob('*.exe'))
+        for exe_file in exe_files:
+            if exe_file.name not in ['LogSentry-CLI.exe', 'LogSentry-Web.exe']:
+                continue
+            
             try:
-                shutil.copy2(doc_file, release_dir / doc_file)
-                print(f"   ✅ Copied {doc_file}")
+                zf.write(exe_file, arcname=exe_file.name)
+                print(f"   ✅ Added {exe_file.name}")
             except Exception as e:
-                print(f"   ❌ Failed to copy {doc_file}: {e}")
-    
-    # Create usage instructions
-    usage_file = release_dir / 'USAGE.txt'
-    with open(usage_file, 'w') as f:
-        f.write("""LogSentry Security Log Analyzer - Standalone Executables
-Created by Anthony Frederick, 2025
-
-USAGE INSTRUCTIONS:
-
-1. CLI Interface:
-   - Run: LogSentry-CLI.exe --help
-   - Example: LogSentry-CLI.exe analyze logfile.txt
-   - Example: LogSentry-CLI.exe scan C:\\logs --pattern "*.log"
-
-2. Web Interface:
-   - Run: LogSentry-Web.exe
-   - Open browser to: http://localhost:5000
-   - Upload log files via web interface
-   - View interactive charts and results
-
-3. Command Line Options:
-   - LogSentry-CLI.exe analyze [file] --verbose --severity high
-   - LogSentry-Web.exe --port 8080 --no-browser
-
-4. Supported Log Formats:
-   - Apache/Nginx access logs
-   - Windows Event Logs
-   - Syslog files
-   - Firewall logs
-   - JSON logs
-   - CSV files
-   - Compressed (.gz) files
-
-5. Security Features:
-   - SQL injection detection
-   - XSS attack detection
-   - Directory traversal detection
-   - Brute force detection
-   - Privilege escalation detection
-   - And many more...
-
-For full documentation, see README.md and WEB_INTERFACE.md
-
-Created by Anthony Frederick, 2025
-""")
+                print(f"   ❌ Failed to add {exe_file.name}: {e}")
+        
+        # Add documentation
+        doc_files = ['README.md', 'WEB_INTERFACE.md', 'INSTALLATION.md', 'LICENSE']
+        for doc_file in doc_files:
+            if os.path.exists(doc_file):
+                try:
+                    zf.write(doc_file, arcname=doc_file)
+                    print(f"   ✅ Added {doc_file}")
+                except Exception as e:
+                    print(f"   ❌ Failed to add {doc_file}: {e}")
+        
+        # Add usage instructions
+        zf.writestr('USAGE.txt', _USAGE_BYTES)
     
     print(f"   ✅ Created usage instructions")
-    print(f"   📁 Release package: {release_dir.absolute()}")
+    print(f"   📁 Release package: {release_zip.absolute()}")
     
-    # Calculate total size
-    total_size = sum(f.stat().st_size for f in release_dir.rglob('*') if f.is_file())
-    total_size_mb = total_size / (1024 * 1024)
+    # Report archive size
+    total_size_mb = release_zip.stat().st_size / (1024 * 1024)
     print(f"   📊 Total package size: {total_size_mb:.1f} MB")
     
-    return release_dir
+    return release_zip
 
-def main():
+def main(argv=None):
     """Main build function"""
+    parser = argparse.ArgumentParser(description="Build LogSentry executables with PyInstaller")
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Clean previous builds and PyInstaller's cache before building"
+    )
+    args = parser.parse_args(argv)
+    
     print_header()
     
     # Check if we're in the right directory
@@ -238,12 +408,20 @@ def main():
         print("💡 Change to the directory containing the 'logsentry' folder")
         sys.exit(1)
     
+    if os.environ.get('LOGSENTRY_BUILD_PYTHON'):
+        print(f"🐍 Building with interpreter: {os.environ['LOGSENTRY_BUILD_PYTHON']}")
+    
     # Check dependencies
     if not check_dependencies():
         sys.exit(1)
     
-    # Clean previous builds
-    clean_build_directories()
+    # Clean previous builds only when asked; otherwise reuse the cache
+    if args.force:
+        clean_build_directories()
+        if os.path.exists(PYINSTALLER_CACHE):
+            fast_rmtree(PYINSTALLER_CACHE)
+    else:
+        print(f"\n♻️  Reusing build cache: {PYINSTALLER_CACHE} (use --force to rebuild)")
     
     # Build executables
     builds = [
@@ -254,8 +432,19 @@ def main():
     successful_builds = 0
     total_builds = len(builds)
     
+    # The builds are independent, so run them side by side and collect
+    # the results in order once each process exits
+    handles = []
     for spec_file, exe_name in builds:
-        if build_executable(spec_file, exe_name):
+        try:
+            handles.append((_launch(spec_file, exe_name), exe_name, time.time()))
+        except Exception as e:
+            print(f"   ❌ Build error for {exe_name}: {e}")
+    
+    print(f"\n⏳ Waiting for {len(handles)} build(s) to finish...")
+    for process, exe_name, start_time in handles:
+        print(f"\n📋 {exe_name}:")
+        if _finish(process, exe_name, start_time):
             successful_builds += 1
     
     # Summary
@@ -265,11 +454,11 @@ def main():
     
     if successful_builds > 0:
         # Create release package
-        release_dir = create_release_package()
+        release_package = create_release_package()
         
         print(f"\n🎉 Build completed successfully!")
         print(f"📦 Executables available in: {Path('dist').absolute()}")
-        print(f"📁 Release package: {release_dir}")
+        print(f"📁 Release package: {release_package}")
         print(f"\n💡 Next steps:")
         print(f"   1. Test the executables")
         print(f"   2. Distribute the release package")
@@ -6,6 +6,30 @@ Debug script to check what files are available when running as executable
 import os
 import sys
 
+def _print_tree(path, name, level=0):
+    """Print a directory listing using os.scandir, files before subdirectories"""
+    print(f"{' ' * 2 * level}{name}/")
+    sub_indent = ' ' * 2 * (level + 1)
+    
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+            else:
+                print(f"{sub_indent}{entry.name}")
+    
+    for entry in subdirs:
+        _print_tree(entry.path, entry.name, level + 1)
+
+def _list_names(path):
+    """Return the set of entry names in a directory (empty if it is missing)"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
 def main():
     print("🔍 Executable Debug Information")
     print("=" * 50)
@@ -26,13 +50,7 @@ def main():
     # List all files in the base path
     print("📁 Files in executable:")
     try:
-        for root, dirs, files in os.walk(base_path):
-            level = root.replace(base_path, '').count(os.sep)
-            indent = ' ' * 2 * level
-            print(f"{indent}{os.path.basename(root)}/")
-            sub_indent = ' ' * 2 * (level + 1)
-            for file in files:
-                print(f"{sub_indent}{file}")
+        _print_tree(base_path, os.path.basename(base_path))
     except Exception as e:
         print(f"❌ Error listing files: {e}")
     
@@ -50,9 +68,14 @@ def main():
     ]
     
     print("🔍 Important Path Checks:")
+    # List each parent directory once and test membership, instead of
+    # stat'ing every path separately
+    listings = {}
     for path in important_paths:
-        full_path = os.path.join(base_path, path)
-        exists = os.path.exists(full_path)
+        parent, _, name = path.rpartition('/')
+        if parent not in listings:
+            listings[parent] = _list_names(os.path.join(base_path, parent))
+        exists = name in listings[parent]
         status = "✅" if exists else "❌"
         print(f"   {status} {path}")
     
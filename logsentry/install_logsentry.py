@@ -11,6 +11,13 @@ import subprocess
 import sys
 import os
 import platform
+import threading
+from collections import deque
+
+# Build tools and runtime dependencies, installed in a single pip run so pip
+# starts up and resolves the environment only once
+BUILD_TOOLS = ["setuptools", "wheel"]
+DEPENDENCIES = ["click", "python-dateutil", "colorama", "rich", "pyyaml", "regex"]
 
 def print_header():
     """Print the installation header"""
@@ -33,34 +40,66 @@ def check_python_version():
     print("✅ Python version compatible")
     return True
 
+def _stream_command(command, timeout):
+    """Run a command, streaming its output and keeping only the last lines
+    
+    pip can print megabytes while resolving; only the tail is useful for
+    reporting, so output is read through a 64 KB buffer into a bounded deque.
+    Raises CalledProcessError or TimeoutExpired like subprocess.run(check=True).
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=65536
+    )
+    
+    timed_out = []
+    
+    def _kill():
+        timed_out.append(True)
+        process.kill()
+    
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    tail = deque(maxlen=32)
+    try:
+        for line in process.stdout:
+            tail.append(line.rstrip())
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    
+    output = "\n".join(line for line in tail if line)
+    if timed_out:
+        raise subprocess.TimeoutExpired(command, timeout, output=output)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, output=output)
+    return output
+
 def run_command(command, description, allow_failure=False):
-    """Run a command and handle errors gracefully"""
+    """Run a command (given as an argv list) and handle errors gracefully"""
     print(f"\n🔄 {description}...")
     
     try:
-        # Use shell=True for cross-platform compatibility
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            check=True, 
-            capture_output=True, 
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
+        # argv lists run without an intermediate shell on every platform
+        output = _stream_command(command, timeout=120)  # 2 minute timeout
         
         print(f"✅ {description} completed successfully")
-        if result.stdout.strip():
-            print(f"   Output: {result.stdout.strip()}")
+        if output:
+            print(f"   Output: {output}")
         return True
         
     except subprocess.CalledProcessError as e:
         if allow_failure:
             print(f"⚠️  {description} failed (continuing anyway)")
-            print(f"   Error: {e.stderr.strip() if e.stderr else 'Unknown error'}")
+            print(f"   Error: {e.output or 'Unknown error'}")
             return False
         else:
             print(f"❌ {description} failed")
-            print(f"   Error: {e.stderr.strip() if e.stderr else 'Unknown error'}")
+            print(f"   Error: {e.output or 'Unknown error'}")
             return False
             
     except subprocess.TimeoutExpired:
@@ -76,14 +115,14 @@ def detect_installation_method():
     
     # Check if we can use virtual environments
     venv_available = run_command(
-        "python -m venv --help", 
+        [sys.executable, "-m", "venv", "--help"], 
         "Checking virtual environment support", 
         allow_failure=True
     )
     
     # Check if we have pip
     pip_available = run_command(
-        "pip --version", 
+        ["pip", "--version"], 
         "Checking pip availability", 
         allow_failure=True
     )
@@ -105,23 +144,27 @@ def install_with_venv():
     """Install using virtual environment (recommended)"""
     print("\n📦 Installing with Virtual Environment Method")
     
+    # LOGSENTRY_PYTHON selects the interpreter the venv is built from, e.g. a
+    # PGO/LTO-optimized CPython build for faster regex-heavy scans
+    python_cmd = os.environ.get('LOGSENTRY_PYTHON', sys.executable)
+    if python_cmd != sys.executable:
+        print(f"🐍 Using interpreter: {python_cmd}")
+    
     commands = [
-        ("python -m venv logsentry_env", "Creating virtual environment"),
+        ([python_cmd, "-m", "venv", "logsentry_env"], "Creating virtual environment"),
     ]
     
-    # Platform-specific activation
+    # Call the venv's interpreter directly; activation scripts need a shell,
+    # and pip can only upgrade itself when run as "python -m pip" on Windows
     if platform.system() == "Windows":
-        activate_cmd = "logsentry_env\\Scripts\\activate"
-        pip_cmd = "logsentry_env\\Scripts\\pip"
+        pip_cmd = ["logsentry_env\\Scripts\\python.exe", "-m", "pip"]
     else:
-        activate_cmd = "source logsentry_env/bin/activate"
-        pip_cmd = "logsentry_env/bin/pip"
+        pip_cmd = ["logsentry_env/bin/python", "-m", "pip"]
     
-    commands.extend([
-        (f"{pip_cmd} install --upgrade pip", "Upgrading pip in virtual environment"),
-        (f"{pip_cmd} install setuptools wheel", "Installing build tools"),
-        (f"{pip_cmd} install click python-dateutil colorama rich pyyaml regex", "Installing dependencies"),
-    ])
+    commands.append(
+        (pip_cmd + ["install", "--upgrade", "pip"] + BUILD_TOOLS + DEPENDENCIES,
+         "Installing pip, build tools and dependencies"),
+    )
     
     for command, description in commands:
         if not run_command(command, description):
@@ -142,15 +185,14 @@ def install_with_user():
     print("\n📦 Installing with User Installation Method")
     
     commands = [
-        ("pip install --user --upgrade pip", "Upgrading pip"),
-        ("pip install --user setuptools wheel", "Installing build tools"),
-        ("pip install --user click python-dateutil colorama rich pyyaml regex", "Installing dependencies"),
+        ([sys.executable, "-m", "pip", "install", "--user", "--upgrade", "pip"] + BUILD_TOOLS + DEPENDENCIES,
+         "Installing pip, build tools and dependencies"),
     ]
     
     for command, description in commands:
         if not run_command(command, description):
             # Try alternative method
-            alt_command = command.replace("--user", "--break-system-packages")
+            alt_command = ["--break-system-packages" if arg == "--user" else arg for arg in command]
             print(f"🔄 Trying alternative method...")
             if not run_command(alt_command, description):
                 return False
@@ -166,8 +208,8 @@ def install_basic():
     print("\n📦 Installing with Basic Method")
     
     commands = [
-        ("python -m pip install setuptools wheel", "Installing build tools"),
-        ("python -m pip install click python-dateutil colorama rich pyyaml regex", "Installing dependencies"),
+        ([sys.executable, "-m", "pip", "install"] + BUILD_TOOLS + DEPENDENCIES,
+         "Installing build tools and dependencies"),
     ]
     
     for command, description in commands:
@@ -184,13 +226,15 @@ def verify_installation():
     """Verify that LogSentry was installed correctly"""
     print("\n🔍 Verifying installation...")
     
-    # Test importing core modules
+    # Check core modules are importable; find_spec locates them without
+    # running their (sometimes heavy) package initialization
     try:
-        import importlib
+        import importlib.util
         modules = ['click', 'rich', 'yaml', 'regex']
         
         for module in modules:
-            importlib.import_module(module)
+            if importlib.util.find_spec(module) is None:
+                raise ImportError(f"No module named '{module}'")
             print(f"✅ {module} module available")
             
     except ImportError as e:
@@ -202,7 +246,7 @@ def verify_installation():
     # Test LogSentry CLI
     if os.path.exists("logsentry"):
         test_success = run_command(
-            "python -m logsentry.cli --help", 
+            [sys.executable, "-m", "logsentry.cli", "--help"], 
             "Testing LogSentry CLI", 
             allow_failure=True
         )
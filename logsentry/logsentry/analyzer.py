@@ -9,20 +9,48 @@ security threats and generates comprehensive analysis reports.
 """
 
 import os
+import fnmatch
+import glob
 import gzip
-from typing import Dict, List, Any, Optional, Tuple, Generator
+import heapq
+import itertools
+import operator
+import mmap
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Generator, Iterable, Union
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
 import json
 
+try:
+    import orjson  # Optional C JSON serializer used for exports when installed
+except ImportError:
+    orjson = None
+
+try:
+    import rapidgzip  # Optional multi-threaded gzip decompressor
+except ImportError:
+    rapidgzip = None
+
 from .parsers import LogParserManager, LogEntry
 from .rules import RuleEngine, Detection, Severity
 from .utils import (
-    is_valid_ip, is_private_ip, extract_ips_from_text,
-    get_geolocation_info, format_bytes
+    IP_RE, is_valid_ip, is_private_ip, get_geolocation_info_bulk,
+    clear_geolocation_cache, normalize_timestamp
 )
 
+# Plain files larger than this are read through mmap in multi-MiB blocks
+_MMAP_THRESHOLD = 64 << 20
+_MMAP_BLOCK_SIZE = 4 << 20
+
+# Other files (including decompressed .gz streams) are read in raw blocks of this size
+_READ_BLOCK_SIZE = 4 << 20
+
 
 @dataclass
 class AnalysisResult:
@@ -82,6 +110,271 @@ class IPAnalysis:
     geolocation: Dict[str, Any]                 # Geographic/network metadata
 
 
+class _IPStats:
+    """
+    Per-IP statistics stored as parallel maps keyed by IP address
+    
+    One small map per attribute keeps each update to a single lookup and
+    avoids a six-key dict per address on logs with many unique IPs.
+    """
+    __slots__ = ('counts', 'first_seen', 'last_seen', 'private', 'invalid', 'detections')
+    
+    def __init__(self):
+        self.counts = Counter()                 # IP -> occurrences, in first-seen order
+        self.first_seen = {}                    # IP -> earliest timestamp
+        self.last_seen = {}                     # IP -> latest timestamp
+        self.private = set()                    # IPs in private address space
+        self.invalid = set()                    # source_ip values rejected by validation
+        self.detections = defaultdict(list)     # IP mentioned in detections -> detections
+
+
+class _IncrementalState:
+    """
+    Running aggregates for a single analysis, updated one chunk at a time
+    
+    Per-IP statistics, hourly timeline buckets and log type counts are folded
+    in as each chunk is processed, so parsed log entries can be dropped as
+    soon as their chunk is done instead of being held for the whole file.
+    Detections are kept because they are part of the AnalysisResult.
+    """
+    
+    def __init__(self, track_ips: bool = True, track_timeline: bool = True):
+        self.track_ips = track_ips
+        self.track_timeline = track_timeline
+        self.detections = []
+        self.parsed_lines = 0
+        self.log_types = Counter()
+        self.ips = _IPStats()
+        self.timeline = {}  # Hour -> detections in that hour, built into buckets at the end
+        self._hour_buckets = {}  # Raw timestamp -> its hour's detection list (or None)
+    
+    def update(self, log_entries: List[LogEntry], detections: List[Detection]):
+        """Fold one chunk of parsed entries and detections into the aggregates"""
+        self.parsed_lines += len(log_entries)
+        self.detections.extend(detections)
+        
+        self.log_types.update([entry.log_type for entry in log_entries])
+        
+        if not self.track_ips:
+            if self.track_timeline:
+                for detection in detections:
+                    if detection.timestamp:
+                        self._add_to_timeline(detection)
+            return
+        
+        ips = self.ips
+        counts = ips.counts
+        first_seen = ips.first_seen
+        last_seen = ips.last_seen
+        invalid = ips.invalid
+        
+        # Work column-wise: validate each new address once per chunk, then
+        # count the whole IP column in a single C-level Counter update
+        column = [entry.source_ip for entry in log_entries]
+        new_ips = set(column).difference(counts, invalid)
+        for ip in new_ips:
+            if not ip or not is_valid_ip(ip):
+                invalid.add(ip)
+            elif is_private_ip(ip):
+                ips.private.add(ip)
+        
+        pairs = zip(column, [entry.timestamp for entry in log_entries])
+        if invalid:
+            pairs = [(ip, ts) for ip, ts in pairs if ip not in invalid]
+        else:
+            pairs = list(pairs)
+        counts.update([ip for ip, _ in pairs])
+        
+        for ip, timestamp in pairs:
+            if timestamp:
+                seen = first_seen.get(ip)
+                if seen is None or timestamp < seen:
+                    first_seen[ip] = timestamp
+                seen = last_seen.get(ip)
+                if seen is None or timestamp > seen:
+                    last_seen[ip] = timestamp
+        
+        find_ips = IP_RE.findall
+        ip_detections = ips.detections
+        for detection in detections:
+            # An IP may only show up in a later chunk's entries, so detections
+            # are matched against the final IP table in ip_analysis()
+            matched_text = detection.matched_text
+            if '.' in matched_text:  # cheap guard: no dotted quad without a dot
+                for ip in find_ips(matched_text):
+                    ip_detections[ip].append(detection)
+            
+            if self.track_timeline and detection.timestamp:
+                self._add_to_timeline(detection)
+    
+    def merge(self, other: '_IncrementalState', line_offset: int = 0):
+        """
+        Fold the aggregates of a later part of the same file into this state
+        
+        ``other`` must cover the lines that follow the ones already folded
+        in; its line numbers are shifted by ``line_offset`` so they refer to
+        positions in the whole file.
+        """
+        if line_offset:
+            # Timeline entries are the same Detection objects, so this
+            # rebases them too
+            for detection in other.detections:
+                detection.line_number += line_offset
+        
+        self.parsed_lines += other.parsed_lines
+        self.detections.extend(other.detections)
+        self.log_types.update(other.log_types)
+        
+        ips, other_ips = self.ips, other.ips
+        for ip, count in other_ips.counts.items():
+            ips.counts[ip] += count
+        ips.private |= other_ips.private
+        ips.invalid |= other_ips.invalid
+        for ip, seen in other_ips.first_seen.items():
+            if ip not in ips.first_seen or seen < ips.first_seen[ip]:
+                ips.first_seen[ip] = seen
+        for ip, seen in other_ips.last_seen.items():
+            if ip not in ips.last_seen or seen > ips.last_seen[ip]:
+                ips.last_seen[ip] = seen
+        for ip, ip_detections in other_ips.detections.items():
+            ips.detections[ip].extend(ip_detections)
+        
+        for hour_key, hour_detections in other.timeline.items():
+            if hour_key in self.timeline:
+                self.timeline[hour_key].extend(hour_detections)
+            else:
+                self.timeline[hour_key] = hour_detections
+    
+    @staticmethod
+    def _hour_key(timestamp) -> Optional[datetime]:
+        """Floor a detection timestamp to its hour, or None if it can't be parsed"""
+        hour_key = None
+        try:
+            # Parse timestamp if it's a string
+            if isinstance(timestamp, str):
+                dt = normalize_timestamp(timestamp)
+            else:
+                dt = timestamp
+            
+            if dt:
+                # Round to nearest hour - ensure timezone naive
+                if dt.tzinfo is not None:
+                    dt = dt.replace(tzinfo=None)
+                hour_key = dt.replace(minute=0, second=0, microsecond=0)
+        except Exception:
+            pass  # Skip detections with unparseable timestamps
+        
+        return hour_key
+    
+    def _add_to_timeline(self, detection: Detection):
+        """
+        File a detection under its hourly timeline bucket
+        
+        Many detections share a timestamp (several rules firing on one line,
+        bursts within the same second), so each distinct raw value is parsed
+        once and then maps straight to its hour's list with a single lookup.
+        """
+        timestamp = detection.timestamp
+        try:
+            hour_detections = self._hour_buckets[timestamp]
+        except KeyError:
+            hour_key = self._hour_key(timestamp)
+            if hour_key is not None:
+                hour_detections = self.timeline.setdefault(hour_key, [])
+            else:
+                hour_detections = None
+            self._hour_buckets[timestamp] = hour_detections
+        
+        if hour_detections is not None:
+            hour_detections.append(detection)
+    
+    def ip_analysis(self, geo_reader=None, include_geo: bool = True,
+                    geo_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Build the IP analysis section from the accumulated statistics
+        
+        When a MaxMind database reader is given, public IPs are geolocated
+        from it, reusing and filling geo_cache when one is passed; otherwise
+        the placeholder geolocation lookup is used.
+        With include_geo=False every geolocation is left empty.
+        """
+        if not self.track_ips:
+            return {
+                'total_unique_ips': 0,
+                'private_ips': 0,
+                'public_ips': 0,
+                'top_ips': [],
+                'suspicious_ips': []
+            }
+        
+        ips = self.ips
+        counts = ips.counts
+        
+        # Only IPs seen in the log entries are reported
+        top_ips = heapq.nlargest(20, counts, key=counts.__getitem__)
+        # Kept in first-seen order; most runs have no IPs in matched text at all
+        ip_detections = ips.detections
+        suspicious_ips = [ip for ip in counts if ip in ip_detections] if ip_detections else []
+        
+        # Get geolocation for the reported external IPs in a single batch
+        public = [ip for ip in dict.fromkeys(top_ips + suspicious_ips) if ip not in ips.private]
+        if not include_geo:
+            geolocation = {}
+        elif geo_reader is not None:
+            if geo_cache is None:
+                geo_cache = {}
+            for ip in public:
+                if ip not in geo_cache:
+                    geo_cache[ip] = geo_reader.get(ip) or {}
+            geolocation = {ip: dict(geo_cache[ip]) for ip in public}
+        else:
+            geolocation = get_geolocation_info_bulk(public)
+        
+        def ip_record(ip: str) -> Dict[str, Any]:
+            return {
+                'ip': ip,
+                'count': counts[ip],
+                'first_seen': ips.first_seen.get(ip),
+                'last_seen': ips.last_seen.get(ip),
+                'detections': ips.detections.get(ip, []),
+                'is_private': ip in ips.private,
+                'geolocation': geolocation.get(ip, {})
+            }
+        
+        return {
+            'total_unique_ips': len(counts),
+            'private_ips': len(ips.private),
+            'public_ips': len(counts) - len(ips.private),
+            'top_ips': [ip_record(ip) for ip in top_ips],
+            'suspicious_ips': [ip_record(ip) for ip in suspicious_ips]
+        }
+    
+    def sorted_timeline(self) -> List[Dict[str, Any]]:
+        """
+        Build the timeline buckets in chronological order
+        
+        Only references to the detections are kept while streaming; the
+        per-bucket counters and event records are materialized here, once.
+        """
+        timeline = []
+        for hour_key in sorted(self.timeline):
+            hour_detections = self.timeline[hour_key]
+            severities = [d.severity.value for d in hour_detections]
+            categories = [d.category for d in hour_detections]
+            timeline.append({
+                'timestamp': hour_key,
+                'total_detections': len(hour_detections),
+                'by_severity': Counter(severities),
+                'by_category': Counter(categories),
+                'events': [
+                    {'rule': d.rule_name, 'severity': severity, 'category': category, 'line': d.line_number}
+                    for d, severity, category in zip(hour_detections, severities, categories)
+                ]
+            })
+        
+        return timeline
+
+
 class LogAnalyzer:
     """
     Main log analysis engine that orchestrates the complete analysis process
@@ -104,7 +397,7 @@ class LogAnalyzer:
     - Scalable: Handles multiple files and directory scanning
     """
     
-    def __init__(self, custom_rules: Optional[List] = None):
+    def __init__(self, custom_rules: Optional[List] = None, mmdb_path: Optional[str] = None):
         """
         Initialize the LogAnalyzer with parsers, rules, and configuration
         
@@ -116,6 +409,9 @@ class LogAnalyzer:
         Args:
             custom_rules (Optional[List]): List of custom DetectionRule objects
                                           to add to the built-in rule set
+            mmdb_path (Optional[str]): Path to a local MaxMind .mmdb database
+                                      used for offline IP geolocation
+                                      (requires the maxminddb package)
         
         Example:
             >>> analyzer = LogAnalyzer()  # Use built-in rules only
@@ -134,6 +430,20 @@ class LogAnalyzer:
         # Larger chunks = faster processing but more memory usage
         self.chunk_size = 10000  # Process 10,000 lines at a time
         
+        # Keep custom rules so worker processes can rebuild an equivalent analyzer
+        self.custom_rules = list(custom_rules) if custom_rules else []
+        
+        # Optional offline GeoIP database, memory-mapped once per analyzer
+        self.mmdb_path = mmdb_path
+        self._geo_reader = None
+        self._geo_cache: Dict[str, Dict[str, Any]] = {}
+        if mmdb_path:
+            try:
+                import maxminddb
+            except ImportError:
+                raise ImportError("mmdb_path requires the maxminddb package (pip install maxminddb)")
+            self._geo_reader = maxminddb.open_database(mmdb_path, maxminddb.MODE_MMAP)
+        
         # Add custom security rules if provided by user
         if custom_rules:
             for rule in custom_rules:
@@ -141,54 +451,132 @@ class LogAnalyzer:
             # Recompile regex patterns after adding custom rules for performance
             self.rule_engine._compile_patterns()
     
-    def analyze_file(self, file_path: str, max_lines: Optional[int] = None) -> AnalysisResult:
-        """Analyze a single log file"""
+    def close(self):
+        """Release the GeoIP database reader, if one was opened"""
+        if self._geo_reader is not None:
+            self._geo_reader.close()
+            self._geo_reader = None
+    
+    def clear_geo_cache(self):
+        """Drop memoized geolocation results (e.g. after the database is updated)"""
+        self._geo_cache.clear()
+        clear_geolocation_cache()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def analyze_file(self, file_path: str, max_lines: Optional[int] = None,
+                     include_timeline: bool = True, include_ip_geo: bool = True,
+                     include_ip_analysis: bool = True) -> AnalysisResult:
+        """
+        Analyze a single log file
+        
+        The include_* flags skip passes whose output the caller doesn't need,
+        e.g. a CI scan that only counts detections. A skipped timeline is
+        empty, skipped geolocation leaves each IP's geolocation empty, and a
+        skipped IP analysis reports zero IPs (so IPs don't add to the risk
+        score).
+        """
         start_time = datetime.now()
         
-        detections = []
-        log_entries = []
-        total_lines = 0
-        parsed_lines = 0
+        state = _IncrementalState(track_ips=include_ip_analysis, track_timeline=include_timeline)
+        
+        try:
+            with self._open_log(file_path) as f:
+                total_lines = self._analyze_chunks(_prefetch(self._read_in_chunks(f, max_lines)), state)
+        
+        except Exception as e:
+            raise Exception(f"Error analyzing file {file_path}: {str(e)}")
+        
+        return self._build_result(file_path, start_time, total_lines, state, include_ip_geo)
+    
+    def analyze_file_parallel(self, file_path: str, n_workers: Optional[int] = None,
+                              include_timeline: bool = True, include_ip_geo: bool = True,
+                              include_ip_analysis: bool = True) -> AnalysisResult:
+        """
+        Analyze a single large log file by splitting it across worker processes
+        
+        The file is divided into ``n_workers`` byte ranges. Each worker seeks to
+        its range, skips forward to the next line start and analyzes every line
+        that starts inside its range, so no line is split or counted twice.
+        Line numbers are rebased onto the whole file before the shards are
+        merged. Compressed files have no random access and are analyzed
+        serially with ``analyze_file``.
+        
+        Args:
+            file_path (str): Path to the log file
+            n_workers (Optional[int]): Number of worker processes (default: CPU count)
+            include_timeline, include_ip_geo, include_ip_analysis: As for ``analyze_file``
+        
+        Returns:
+            AnalysisResult: Same result as ``analyze_file`` would produce
+        """
+        n_workers = n_workers or os.cpu_count() or 1
+        if file_path.endswith('.gz') or n_workers < 2:
+            return self.analyze_file(file_path, include_timeline=include_timeline,
+                                     include_ip_geo=include_ip_geo,
+                                     include_ip_analysis=include_ip_analysis)
+        
+        start_time = datetime.now()
         
         try:
-            # Determine if file is compressed
-            open_func = gzip.open if file_path.endswith('.gz') else open
-            mode = 'rt' if file_path.endswith('.gz') else 'r'
+            file_size = os.stat(file_path).st_size
+            step = max(1, -(-file_size // n_workers))
+            starts = list(range(0, file_size, step)) or [0]
+            ends = starts[1:] + [file_size]
             
-            with open_func(file_path, mode, encoding='utf-8', errors='ignore') as f:
-                for chunk in self._read_in_chunks(f, max_lines):
-                    chunk_entries = self.parser_manager.parse_lines(chunk, total_lines + 1)
-                    chunk_detections = self.rule_engine.analyze_log_chunk(chunk)
-                    
-                    log_entries.extend(chunk_entries)
-                    detections.extend(chunk_detections)
-                    
-                    total_lines += len(chunk)
-                    parsed_lines += len(chunk_entries)
+            with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+                shards = list(executor.map(
+                    _analyze_shard_worker,
+                    [file_path] * len(starts),
+                    starts,
+                    ends,
+                    [self.custom_rules] * len(starts),
+                    [self.chunk_size] * len(starts),
+                    [include_ip_analysis] * len(starts),
+                    [include_timeline] * len(starts)
+                ))
         
         except Exception as e:
             raise Exception(f"Error analyzing file {file_path}: {str(e)}")
         
+        state = _IncrementalState(track_ips=include_ip_analysis, track_timeline=include_timeline)
+        total_lines = 0
+        
+        for line_count, shard_state in shards:
+            # Shards number their lines from 1; shift them to file positions
+            state.merge(shard_state, total_lines)
+            total_lines += line_count
+        
+        return self._build_result(file_path, start_time, total_lines, state, include_ip_geo)
+    
+    def _build_result(self, file_path: str, start_time: datetime, total_lines: int,
+                      state: _IncrementalState, include_ip_geo: bool = True) -> AnalysisResult:
+        """Turn the aggregated analysis state into an AnalysisResult"""
         # Generate analysis results
         analysis_time = (datetime.now() - start_time).total_seconds()
         
         # Get log type statistics
-        log_types = self.parser_manager.get_parser_stats(log_entries)
+        log_types = dict(state.log_types)
         
         # Perform IP analysis
-        ip_analysis = self._analyze_ips(log_entries, detections)
+        ip_analysis = state.ip_analysis(self._geo_reader, include_geo=include_ip_geo,
+                                        geo_cache=self._geo_cache)
         
         # Generate timeline
-        timeline = self._generate_timeline(detections)
+        timeline = state.sorted_timeline()
         
         # Generate summary
-        summary = self._generate_summary(detections, log_entries, ip_analysis)
+        summary = self._generate_summary(state.detections, state.parsed_lines, ip_analysis)
         
         return AnalysisResult(
             file_path=file_path,
             total_lines=total_lines,
-            parsed_lines=parsed_lines,
-            detections=detections,
+            parsed_lines=state.parsed_lines,
+            detections=state.detections,
             summary=summary,
             analysis_time=analysis_time,
             log_types=log_types,
@@ -196,175 +584,152 @@ class LogAnalyzer:
             timeline=timeline
         )
     
-    def analyze_directory(self, directory: str, pattern: str = "*.log") -> List[AnalysisResult]:
-        """Analyze all log files in a directory"""
-        import glob
+    def analyze_directory(self, directory: str, pattern: str = "*.log",
+                          include_timeline: bool = True, include_ip_geo: bool = False,
+                          include_ip_analysis: bool = True,
+                          workers: Optional[int] = None) -> List[AnalysisResult]:
+        """
+        Analyze all log files in a directory
+        
+        Files are independent and analysis is CPU-bound regex work, so with
+        more than one file they are spread over a process pool (one process
+        per core unless ``workers`` is given). Results are returned in the
+        same order as the files. ``workers=1`` analyzes the files in this
+        process, which is handy for profiling. The include_* flags are
+        passed to ``analyze_file``; geolocation is off by default for bulk
+        scans.
+        """
+        return list(self.iter_analyze_directory(
+            directory, pattern,
+            include_timeline=include_timeline,
+            include_ip_geo=include_ip_geo,
+            include_ip_analysis=include_ip_analysis,
+            workers=workers
+        ))
+    
+    def iter_analyze_directory(self, directory: str, pattern: str = "*.log",
+                               include_timeline: bool = True, include_ip_geo: bool = False,
+                               include_ip_analysis: bool = True,
+                               workers: Optional[int] = None) -> Generator[AnalysisResult, None, None]:
+        """
+        Analyze the log files in a directory, yielding each result in file order
         
-        results = []
-        log_files = glob.glob(os.path.join(directory, pattern))
+        Same as ``analyze_directory``, but results are handed over one at a
+        time as they become available, so callers that summarize them (see
+        ``merge_analysis_results``) don't keep every file's detections alive.
+        """
+        log_files = _list_log_files(directory, pattern)
+        options = {
+            'include_timeline': include_timeline,
+            'include_ip_geo': include_ip_geo,
+            'include_ip_analysis': include_ip_analysis
+        }
         
-        for file_path in log_files:
-            try:
-                result = self.analyze_file(file_path)
-                results.append(result)
-            except Exception as e:
-                print(f"Warning: Failed to analyze {file_path}: {e}")
+        max_workers = workers or os.cpu_count() or 1
         
-        return results
+        if len(log_files) < 2 or max_workers == 1:
+            def analyze_serially():
+                for file_path in log_files:
+                    try:
+                        yield self.analyze_file(file_path, **options), None
+                    except Exception as e:
+                        yield None, str(e)
+            
+            yield from self._collect_outcomes(log_files, analyze_serially())
+            return
+        
+        max_workers = min(max_workers, len(log_files))
+        chunksize = max(1, len(log_files) // (max_workers + 2))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # map() yields in file order as soon as each result is ready
+            outcomes = executor.map(
+                _analyze_file_worker,
+                log_files,
+                [self.custom_rules] * len(log_files),
+                [self.mmdb_path] * len(log_files),
+                [options] * len(log_files),
+                chunksize=chunksize
+            )
+            yield from self._collect_outcomes(log_files, outcomes)
     
-    def analyze_text(self, text: str, source_name: str = "text_input") -> AnalysisResult:
-        """Analyze log text directly"""
+    @staticmethod
+    def _collect_outcomes(log_files: List[str],
+                          outcomes: Iterable[Tuple[Optional[AnalysisResult], Optional[str]]]) -> Generator[AnalysisResult, None, None]:
+        """Yield successful results, warning about files that failed"""
+        for file_path, (result, error) in zip(log_files, outcomes):
+            if error is None:
+                yield result
+            else:
+                print(f"Warning: Failed to analyze {file_path}: {error}")
+    
+    def analyze_text(self, text: Union[str, Iterable[str]], source_name: str = "text_input") -> AnalysisResult:
+        """
+        Analyze log text directly, given as one string or as a sequence of lines
+        
+        Lines go through the same chunked pipeline as analyze_file, so large
+        inputs are parsed and matched chunk_size lines at a time.
+        """
         start_time = datetime.now()
         
-        lines = text.strip().split('\n')
-        log_entries = self.parser_manager.parse_lines(lines)
-        detections = self.rule_engine.analyze_log_chunk(lines)
+        lines = text.splitlines() if isinstance(text, str) else text
         
-        analysis_time = (datetime.now() - start_time).total_seconds()
-        log_types = self.parser_manager.get_parser_stats(log_entries)
-        ip_analysis = self._analyze_ips(log_entries, detections)
-        timeline = self._generate_timeline(detections)
-        summary = self._generate_summary(detections, log_entries, ip_analysis)
+        state = _IncrementalState()
+        total_lines = self._analyze_chunks(self._read_in_chunks(iter(lines)), state)
         
-        return AnalysisResult(
-            file_path=source_name,
-            total_lines=len(lines),
-            parsed_lines=len(log_entries),
-            detections=detections,
-            summary=summary,
-            analysis_time=analysis_time,
-            log_types=log_types,
-            ip_analysis=ip_analysis,
-            timeline=timeline
-        )
+        return self._build_result(source_name, start_time, total_lines, state)
     
-    def _read_in_chunks(self, file_obj, max_lines: Optional[int] = None) -> Generator[List[str], None, None]:
-        """Read file in chunks to manage memory usage"""
-        chunk = []
-        lines_read = 0
-        
-        for line in file_obj:
-            if max_lines and lines_read >= max_lines:
-                break
-            
-            chunk.append(line.rstrip('\n\r'))
-            lines_read += 1
+    def _analyze_chunks(self, chunks: Iterable[List[str]], state: '_IncrementalState') -> int:
+        """Parse and match chunks of lines into state, returning the number of lines"""
+        total_lines = 0
+        for chunk in chunks:
+            # Number lines from the start of the input, not of the chunk
+            chunk_entries = self.parser_manager.parse_lines(chunk, total_lines + 1)
+            chunk_detections = self.rule_engine.analyze_log_chunk(chunk, total_lines + 1)
             
-            if len(chunk) >= self.chunk_size:
-                yield chunk
-                chunk = []
+            state.update(chunk_entries, chunk_detections)
+            total_lines += len(chunk)
         
-        if chunk:
-            yield chunk
+        return total_lines
     
-    def _analyze_ips(self, log_entries: List[LogEntry], detections: List[Detection]) -> Dict[str, Any]:
-        """Analyze IP addresses found in logs"""
-        ip_stats = defaultdict(lambda: {
-            'count': 0,
-            'first_seen': None,
-            'last_seen': None,
-            'detections': [],
-            'is_private': False,
-            'geolocation': {}
-        })
+    def _open_log(self, file_path: str):
+        """
+        Open a plain or gzip-compressed log file for text reading
         
-        # Collect IP statistics from log entries
-        for entry in log_entries:
-            if entry.source_ip and is_valid_ip(entry.source_ip):
-                ip = entry.source_ip
-                ip_stats[ip]['count'] += 1
-                ip_stats[ip]['is_private'] = is_private_ip(ip)
-                
-                if entry.timestamp:
-                    if not ip_stats[ip]['first_seen'] or entry.timestamp < ip_stats[ip]['first_seen']:
-                        ip_stats[ip]['first_seen'] = entry.timestamp
-                    if not ip_stats[ip]['last_seen'] or entry.timestamp > ip_stats[ip]['last_seen']:
-                        ip_stats[ip]['last_seen'] = entry.timestamp
-        
-        # Associate detections with IPs
-        for detection in detections:
-            ips_in_detection = extract_ips_from_text(detection.matched_text)
-            for ip in ips_in_detection:
-                if ip in ip_stats:
-                    ip_stats[ip]['detections'].append(detection)
-        
-        # Get geolocation for external IPs (placeholder)
-        for ip, stats in ip_stats.items():
-            if not stats['is_private']:
-                stats['geolocation'] = get_geolocation_info(ip)
-        
-        # Convert to final format
-        result = {
-            'total_unique_ips': len(ip_stats),
-            'private_ips': sum(1 for stats in ip_stats.values() if stats['is_private']),
-            'public_ips': sum(1 for stats in ip_stats.values() if not stats['is_private']),
-            'top_ips': sorted(
-                [{'ip': ip, **stats} for ip, stats in ip_stats.items()],
-                key=lambda x: x['count'],
-                reverse=True
-            )[:20],
-            'suspicious_ips': [
-                {'ip': ip, **stats} for ip, stats in ip_stats.items()
-                if len(stats['detections']) > 0
-            ]
-        }
+        Returns a context manager yielding an iterator of lines without
+        line endings. Files are read as raw bytes in multi-MiB blocks, and
+        each block is decoded and split with a single call instead of
+        decoding and stripping line by line. Compressed files are
+        decompressed in parallel threads when rapidgzip is installed. Very
+        large plain files are memory-mapped instead of read.
+        """
+        if file_path.endswith('.gz'):
+            if rapidgzip is not None:
+                raw = rapidgzip.open(file_path, parallelization=os.cpu_count() or 1)
+            else:
+                raw = gzip.open(file_path, 'rb')
+            return _stream_lines(raw)
+        
+        if os.path.getsize(file_path) > _MMAP_THRESHOLD:
+            return _mmap_lines(file_path)
         
-        return result
+        return _stream_lines(open(file_path, 'rb', buffering=0))
     
-    def _generate_timeline(self, detections: List[Detection]) -> List[Dict[str, Any]]:
-        """Generate timeline of security events"""
-        if not detections:
-            return []
-        
-        # Group detections by hour
-        timeline = defaultdict(lambda: {
-            'timestamp': None,
-            'total_detections': 0,
-            'by_severity': Counter(),
-            'by_category': Counter(),
-            'events': []
-        })
+    def _read_in_chunks(self, file_obj, max_lines: Optional[int] = None) -> Generator[List[str], None, None]:
+        """Read file in chunks to manage memory usage"""
+        if max_lines:
+            file_obj = itertools.islice(file_obj, max_lines)
         
-        for detection in detections:
-            if detection.timestamp:
-                try:
-                    # Parse timestamp if it's a string
-                    if isinstance(detection.timestamp, str):
-                        from .utils import normalize_timestamp
-                        dt = normalize_timestamp(detection.timestamp)
-                    else:
-                        dt = detection.timestamp
-                    
-                    if dt:
-                        # Round to nearest hour - ensure timezone naive
-                        if dt.tzinfo is not None:
-                            dt = dt.replace(tzinfo=None)
-                        hour_key = dt.replace(minute=0, second=0, microsecond=0)
-                        timeline[hour_key]['timestamp'] = hour_key
-                        timeline[hour_key]['total_detections'] += 1
-                        timeline[hour_key]['by_severity'][detection.severity.value] += 1
-                        timeline[hour_key]['by_category'][detection.category] += 1
-                        timeline[hour_key]['events'].append({
-                            'rule': detection.rule_name,
-                            'severity': detection.severity.value,
-                            'category': detection.category,
-                            'line': detection.line_number
-                        })
-                except Exception:
-                    continue  # Skip detections with unparseable timestamps
-        
-        # Convert to sorted list
-        sorted_timeline = sorted(timeline.values(), key=lambda x: x['timestamp'] or datetime.min)
-        
-        return sorted_timeline
-    
-    def _generate_summary(self, detections: List[Detection], log_entries: List[LogEntry], ip_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        # islice pulls a whole chunk of lines through the C iterator at once
+        while chunk := list(itertools.islice(file_obj, self.chunk_size)):
+            yield chunk
+    
+    def _generate_summary(self, detections: List[Detection], parsed_lines: int, ip_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive analysis summary"""
         summary = self.rule_engine.get_detection_summary(detections)
         
         # Add additional summary information
         summary.update({
-            'log_entries_parsed': len(log_entries),
+            'log_entries_parsed': parsed_lines,
             'unique_ips': ip_analysis['total_unique_ips'],
             'private_ips': ip_analysis['private_ips'],
             'public_ips': ip_analysis['public_ips'],
@@ -373,16 +738,21 @@ class LogAnalyzer:
         
         # Top threats
         if detections:
+            # Index detections by rule in a single pass
+            by_rule = defaultdict(list)
+            for d in detections:
+                by_rule[d.rule_name].append(d)
+            
+            rule_counts = {rule_name: len(rule_detections) for rule_name, rule_detections in by_rule.items()}
+            top_rules = heapq.nlargest(10, rule_counts.items(), key=operator.itemgetter(1))
             summary['top_threats'] = [
                 {
                     'rule': rule_name,
                     'count': count,
-                    'severity': next(d.severity.value for d in detections if d.rule_name == rule_name)
+                    'severity': by_rule[rule_name][0].severity.value
                 }
-                for rule_name, count in summary.get('by_rule', {}).items()
+                for rule_name, count in top_rules
             ]
-            summary['top_threats'].sort(key=lambda x: x['count'], reverse=True)
-            summary['top_threats'] = summary['top_threats'][:10]
         else:
             summary['top_threats'] = []
         
@@ -451,83 +821,341 @@ class LogAnalyzer:
     
     def _export_json(self, result: AnalysisResult, output_file: str):
         """Export results as JSON"""
-        # Convert result to dict, handling datetime serialization
-        data = asdict(result)
-        
-        # Convert datetime objects to strings
-        def convert_datetime(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: convert_datetime(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_datetime(item) for item in obj]
-            return obj
-        
-        data = convert_datetime(data)
-        
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        write_json(result, output_file)
     
     def _export_csv(self, result: AnalysisResult, output_file: str):
         """Export detections as CSV"""
         import csv
         
-        with open(output_file, 'w', newline='') as f:
+        with open(output_file, 'w', newline='', buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow([
                 'Line Number', 'Timestamp', 'Severity', 'Rule Name',
                 'Category', 'Description', 'Matched Text', 'Confidence'
             ])
             
-            for detection in result.detections:
-                writer.writerow([
-                    detection.line_number,
-                    detection.timestamp or '',
-                    detection.severity.value,
-                    detection.rule_name,
-                    detection.category,
-                    detection.description,
-                    detection.matched_text[:100],  # Truncate for readability
-                    f"{detection.confidence:.2f}"
-                ])
-
-
-def merge_analysis_results(results: List[AnalysisResult]) -> Dict[str, Any]:
-    """Merge multiple analysis results into a comprehensive report"""
-    if not results:
-        return {}
+            writer.writerows(
+                (
+                    d.line_number,
+                    d.timestamp or '',
+                    d.severity.value,
+                    d.rule_name,
+                    d.category,
+                    d.description,
+                    d.matched_text[:100],  # Truncate for readability
+                    f"{d.confidence:.2f}"
+                )
+                for d in result.detections
+            )
+
+
+def _prefetch(items: Iterable, depth: int = 2) -> Generator[Any, None, None]:
+    """
+    Pull items from an iterator on a background thread, up to depth ahead
+    
+    Used to read and decode the next chunk of a file while the current one
+    is being parsed and matched. File reads, gzip decompression and mmap
+    copies release the GIL, so they overlap with the regex work. Errors
+    from the producer are re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+    
+    producer = threading.Thread(target=produce, name="logsentry-prefetch", daemon=True)
+    producer.start()
+    
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Stop the producer before the caller closes the underlying file
+        stop.set()
+        producer.join()
+
+
+def _split_block(data: bytes) -> List[str]:
+    """
+    Decode a block of whole lines and split it without line endings
     
+    \\r\\n and lone \\r are treated as line breaks, matching text-mode
+    reading. A trailing newline does not produce an empty last line.
+    """
+    text = data.decode('utf-8', errors='ignore')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    if not lines[-1]:
+        lines.pop()  # Block ended with a newline
+    return lines
+
+
+@contextmanager
+def _stream_lines(raw):
+    """Read a binary stream in blocks and yield an iterator over its lines"""
+    with raw:
+        yield _iter_stream_lines(raw)
+
+
+def _iter_stream_lines(raw) -> Generator[str, None, None]:
+    """
+    Yield the lines of a binary stream without line endings
+    
+    Each block is cut after its last newline and the remainder carried
+    into the next read, so a line is never split across blocks.
+    """
+    tail = b''
+    while data := raw.read(_READ_BLOCK_SIZE):
+        if tail:
+            data = tail + data
+        cut = data.rfind(b'\n') + 1
+        if not cut:
+            tail = data  # No complete line yet
+            continue
+        tail = data[cut:]
+        yield from _split_block(data[:cut])
+    
+    if tail:
+        yield from _split_block(tail)
+
+
+@contextmanager
+def _mmap_lines(file_path: str):
+    """Memory-map a plain log file and yield an iterator over its lines"""
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield _iter_mmap_lines(mm)
+
+
+def _iter_mmap_lines(mm: mmap.mmap) -> Generator[str, None, None]:
+    """
+    Yield the lines of a memory-mapped file without line endings
+    
+    The map is decoded in blocks that end on a newline, so each block is
+    decoded and split with a single call.
+    """
+    size = len(mm)
+    pos = 0
+    
+    while pos < size:
+        end = mm.rfind(b'\n', pos, pos + _MMAP_BLOCK_SIZE)
+        if end == -1:
+            # A single line longer than the block size
+            end = mm.find(b'\n', pos + _MMAP_BLOCK_SIZE)
+        end = size if end == -1 else end + 1
+        
+        block = mm[pos:end]
+        pos = end
+        yield from _split_block(block)
+
+
+def _list_log_files(directory: str, pattern: str) -> List[str]:
+    """
+    List the regular files in a directory whose names match a glob pattern
+    
+    Uses os.scandir, whose entries carry the file type from the directory
+    listing, so matching files are found without a stat() call each and
+    subdirectories that happen to match are skipped. Like glob, names
+    starting with '.' only match a pattern that starts with '.', and a
+    missing directory has no files. Patterns that reach into
+    subdirectories are left to glob.
+    """
+    if os.sep in pattern or (os.altsep and os.altsep in pattern):
+        return glob.glob(os.path.join(directory, pattern))
+    
+    include_hidden = pattern.startswith('.')
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry.path for entry in entries
+                if (include_hidden or not entry.name.startswith('.'))
+                and fnmatch.fnmatch(entry.name, pattern)
+                and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []  # Same as glob for a missing directory
+
+
+def write_json(data: Any, output_file: str, default: Optional[Any] = None):
+    """
+    Write analysis data (a result, or a merged report) as indented JSON
+    
+    Uses orjson when it is installed, which serializes dataclasses,
+    datetimes and enums natively; otherwise the stdlib encoder is used with
+    the same conversions, so both produce the same document.
+    
+    Passing ``default`` replaces those conversions, including the ISO
+    format for datetimes, with the given callable, as for ``json.dump``.
+    The directory scan export passes ``str`` to keep its existing format.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        if default is not None:
+            # Route datetimes to the caller's default instead of orjson's ISO output
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, default=default or _json_default, option=option))
+        return
+    
+    # Dataclasses, datetimes and enums are converted by _json_default as
+    # they are encoded, without building a converted copy of the result
+    with open(output_file, 'w') as f:
+        json.dump(data, f, indent=2, default=default or _json_default)
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values the JSON encoders don't handle natively"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        # One level at a time; unlike asdict() this keeps Counters intact
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _analyze_file_worker(file_path: str, custom_rules: List, mmdb_path: Optional[str] = None,
+                         options: Optional[Dict[str, bool]] = None) -> Tuple[Optional[AnalysisResult], Optional[str]]:
+    """
+    Analyze one file in a worker process
+    
+    Module-level so it can be pickled for ProcessPoolExecutor. Errors are
+    returned rather than raised so one bad file doesn't abort the batch.
+    """
+    try:
+        with LogAnalyzer(custom_rules=custom_rules, mmdb_path=mmdb_path) as analyzer:
+            return analyzer.analyze_file(file_path, **(options or {})), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _analyze_shard_worker(file_path: str, start: int, end: int, custom_rules: List,
+                          chunk_size: int, track_ips: bool = True,
+                          track_timeline: bool = True) -> Tuple[int, _IncrementalState]:
+    """
+    Analyze the lines of a file that start within the byte range [start, end)
+    
+    Returns the number of lines read and the shard's aggregated state, with
+    line numbers counted from 1 at the start of the shard. Parsed entries
+    are folded in chunk by chunk, so only aggregates are sent back.
+    """
+    analyzer = LogAnalyzer(custom_rules=custom_rules)
+    state = _IncrementalState(track_ips=track_ips, track_timeline=track_timeline)
+    line_count = 0
+    
+    with open(file_path, 'rb') as f:
+        if start > 0:
+            # The line straddling the boundary belongs to the previous shard
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        
+        chunk = []
+        while position < end:
+            raw_line = f.readline()
+            if not raw_line:
+                break
+            position += len(raw_line)
+            if b'\r' in raw_line:
+                # A lone \r is a line break too, as in the serial reader
+                chunk.extend(_split_block(raw_line))
+            else:
+                chunk.append(raw_line.decode('utf-8', errors='ignore').rstrip('\n'))
+            
+            if len(chunk) >= chunk_size:
+                state.update(analyzer.parser_manager.parse_lines(chunk, line_count + 1),
+                             analyzer.rule_engine.analyze_log_chunk(chunk, line_count + 1))
+                line_count += len(chunk)
+                chunk = []
+        
+        if chunk:
+            state.update(analyzer.parser_manager.parse_lines(chunk, line_count + 1),
+                         analyzer.rule_engine.analyze_log_chunk(chunk, line_count + 1))
+            line_count += len(chunk)
+    
+    return line_count, state
+
+
+def merge_analysis_results(results: Iterable[AnalysisResult]) -> Dict[str, Any]:
+    """
+    Merge multiple analysis results into a comprehensive report
+    
+    ``results`` may be a generator (e.g. ``iter_analyze_directory``): each
+    result is folded in as it arrives and can then be released, so the
+    detections of every file are never held at once.
+    """
     merged = {
-        'total_files': len(results),
-        'total_lines': sum(r.total_lines for r in results),
-        'total_detections': sum(len(r.detections) for r in results),
-        'total_analysis_time': sum(r.analysis_time for r in results),
-        'files': [r.file_path for r in results],
+        'total_files': 0,
+        'total_lines': 0,
+        'total_detections': 0,
+        'total_analysis_time': 0,
+        'files': [],
         'combined_summary': {},
         'top_threats_across_files': Counter(),
         'timeline': []
     }
     
-    # Combine all detections
-    all_detections = []
+    combined = {'by_severity': Counter(), 'by_category': Counter(), 'by_rule': Counter()}
+    confidence_total = 0
+    all_timeline_events = []
+    
     for result in results:
-        all_detections.extend(result.detections)
+        merged['total_files'] += 1
+        merged['total_lines'] += result.total_lines
+        merged['total_detections'] += len(result.detections)
+        merged['total_analysis_time'] += result.analysis_time
+        merged['files'].append(result.file_path)
+        
+        if result.detections:
+            # Per-file counts merge in first-seen order, as over all detections at once
+            summary = RuleEngine.get_detection_summary(result.detections)
+            for key in ('by_severity', 'by_category', 'by_rule'):
+                combined[key].update(summary[key])
+            confidence_total = sum((d.confidence for d in result.detections), confidence_total)
+        
+        all_timeline_events.extend(result.timeline)
+    
+    if not merged['total_files']:
+        return {}
     
     # Generate combined summary
-    if all_detections:
-        rule_engine = RuleEngine()  # Temporary instance for summary
-        merged['combined_summary'] = rule_engine.get_detection_summary(all_detections)
+    if merged['total_detections']:
+        merged['combined_summary'] = {
+            'total': merged['total_detections'],
+            'by_severity': dict(combined['by_severity']),
+            'by_category': dict(combined['by_category']),
+            'by_rule': dict(combined['by_rule']),
+            'confidence_avg': confidence_total / merged['total_detections']
+        }
         
         # Count threats across all files
-        for detection in all_detections:
-            merged['top_threats_across_files'][detection.rule_name] += 1
-    
-    # Combine timelines
-    all_timeline_events = []
-    for result in results:
-        all_timeline_events.extend(result.timeline)
+        merged['top_threats_across_files'] = combined['by_rule']
     
     merged['timeline'] = sorted(all_timeline_events, key=lambda x: x.get('timestamp', datetime.min))
     
-    return merged
\ No newline at end of file
+    return merged
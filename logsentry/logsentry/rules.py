@@ -8,10 +8,23 @@ detection logic, and analysis engines for identifying security threats in log da
 """
 
 import re
-from typing import Dict, List, Any, Optional
+import sys
+from typing import Dict, List, Any, Optional, FrozenSet, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+_REPEAT_OPS = tuple(
+    getattr(_sre_parse, name)
+    for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(_sre_parse, name)
+)
+_ATOMIC_GROUP = getattr(_sre_parse, 'ATOMIC_GROUP', None)
+
 
 class Severity(Enum):
     """
@@ -54,6 +67,11 @@ class DetectionRule:
     category: str                                # Threat category
     tags: List[str]                             # Classification tags
     regex_flags: int = re.IGNORECASE            # Regex compilation flags
+    
+    def __post_init__(self):
+        # Detections share the rule's category string; interning it lets
+        # category filters match by identity
+        self.category = sys.intern(self.category)
 
 
 @dataclass
@@ -328,12 +346,93 @@ class SecurityRules:
         return None
 
 
+def _required_literals(items) -> Optional[set]:
+    """
+    Find literal strings of which at least one occurs in every match
+    
+    Walks a parsed regex sequence and returns the candidate set with the
+    longest shortest-member: a run of literal characters, the union of the
+    literals required by each branch of an alternation, or those of a group
+    or a repeat that must occur at least once. Returns None when nothing
+    can be guaranteed.
+    """
+    best = None
+    run = []
+    
+    def consider(candidates):
+        nonlocal best
+        if candidates and all(candidates):
+            if best is None or min(map(len, candidates)) > min(map(len, best)):
+                best = candidates
+    
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        
+        consider({''.join(run)} if run else None)
+        run = []
+        
+        if op is _sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                consider(_required_literals(sub))
+        elif op is _sre_parse.BRANCH:
+            union = set()
+            for branch in av[1]:
+                literals = _required_literals(branch)
+                if not literals:
+                    union = None
+                    break
+                union |= literals
+            consider(union)
+        elif op in _REPEAT_OPS:
+            min_count, _, sub = av
+            if min_count >= 1:
+                consider(_required_literals(sub))
+        elif op is _ATOMIC_GROUP:
+            consider(_required_literals(av))
+    
+    consider({''.join(run)} if run else None)
+    return best
+
+
+def _rule_prefilter(rule: DetectionRule) -> Optional[Tuple[FrozenSet[str], bool]]:
+    """
+    Build a cheap substring check that a line must pass to match a rule
+    
+    Returns the required literals and whether they must be compared against
+    the case-folded line, or None if no literal is guaranteed. Relies on
+    the stdlib regex parser, so any failure just disables the prefilter.
+    
+    re.IGNORECASE folds some non-ASCII characters differently from
+    str.casefold() (a pattern 'union' matches 'UNİON'), so case-insensitive
+    prefilters only hold for ASCII: rules with non-ASCII literals get none,
+    and analyze_line skips the check on non-ASCII lines.
+    """
+    try:
+        parsed = _sre_parse.parse(rule.pattern, rule.regex_flags)
+        literals = _required_literals(parsed)
+        ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    except Exception:
+        return None
+    
+    if not literals:
+        return None
+    if ignore_case:
+        if not all(literal.isascii() for literal in literals):
+            return None
+        literals = {literal.casefold() for literal in literals}
+    return frozenset(literals), ignore_case
+
+
 class RuleEngine:
     """Engine for applying security rules to log data"""
     
     def __init__(self, rules: Optional[SecurityRules] = None):
         self.rules = rules or SecurityRules()
         self.compiled_patterns = {}
+        self.prefilters = {}
         self._compile_patterns()
     
     def _compile_patterns(self):
@@ -343,16 +442,44 @@ class RuleEngine:
                 self.compiled_patterns[rule.name] = re.compile(rule.pattern, rule.regex_flags)
             except re.error as e:
                 print(f"Warning: Failed to compile pattern for rule '{rule.name}': {e}")
+                continue
+            
+            # Most lines match no rule; a substring test rules them out far
+            # more cheaply than running the regex
+            prefilter = _rule_prefilter(rule)
+            if prefilter is not None:
+                self.prefilters[rule.name] = prefilter
     
     def analyze_line(self, line: str, line_number: int, timestamp: Optional[str] = None) -> List[Detection]:
         """Analyze a single log line against all rules"""
         detections = []
+        folded_line = None
+        line_is_ascii = line.isascii()
         
         for rule in self.rules.rules:
             pattern = self.compiled_patterns.get(rule.name)
             if not pattern:
                 continue
             
+            prefilter = self.prefilters.get(rule.name)
+            if prefilter is not None:
+                literals, ignore_case = prefilter
+                if not ignore_case:
+                    haystack = line
+                elif line_is_ascii:
+                    if folded_line is None:
+                        folded_line = line.casefold()
+                    haystack = folded_line
+                else:
+                    haystack = None  # Non-ASCII case folding can't be trusted; run the regex
+                
+                if haystack is not None:
+                    for literal in literals:
+                        if literal in haystack:
+                            break
+                    else:
+                        continue  # No required literal present, the rule can't match
+            
             matches = pattern.findall(line)
             if matches:
                 # Calculate confidence based on match quality
@@ -408,8 +535,9 @@ class RuleEngine:
         
         return all_detections
     
-    def get_detection_summary(self, detections: List[Detection]) -> Dict[str, Any]:
-        """Generate summary statistics for detections"""
+    @staticmethod
+    def get_detection_summary(detections: List[Detection]) -> Dict[str, Any]:
+        """Generate summary statistics for detections (needs no rule state)"""
         if not detections:
             return {"total": 0, "by_severity": {}, "by_category": {}}
         
@@ -8,11 +8,17 @@ timestamp parsing, and various text processing operations used throughout LogSen
 
 import re
 import ipaddress
+import functools
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import hashlib
 
 
+# IPv4 pattern: matches 0-255.0-255.0-255.0-255 format
+IP_RE = re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
+
+
+@functools.lru_cache(maxsize=100_000)
 def is_valid_ip(ip_string: str) -> bool:
     """
     Validate if a string represents a valid IP address (IPv4 or IPv6)
@@ -36,6 +42,7 @@ def is_valid_ip(ip_string: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=100_000)
 def is_private_ip(ip_string: str) -> bool:
     """
     Determine if an IP address is in a private network range
@@ -77,9 +84,11 @@ def extract_ips_from_text(text: str) -> List[str]:
         >>> extract_ips_from_text("Connection from 192.168.1.1 to 10.0.0.1")
         ['192.168.1.1', '10.0.0.1']
     """
-    # IPv4 pattern: matches 0-255.0-255.0-255.0-255 format
-    ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-    return re.findall(ip_pattern, text)
+    # Every address contains a dot; most syslog/event messages contain none,
+    # and a substring test is far cheaper than the regex scan
+    if '.' not in text:
+        return []
+    return IP_RE.findall(text)
 
 
 def extract_domains_from_text(text: str) -> List[str]:
@@ -104,6 +113,7 @@ def extract_domains_from_text(text: str) -> List[str]:
     return re.findall(domain_pattern, text)
 
 
+@functools.lru_cache(maxsize=65_536)
 def normalize_timestamp(timestamp_str: str, format_hint: Optional[str] = None) -> Optional[datetime]:
     """
     Parse timestamp strings in various common log formats into datetime objects
@@ -112,6 +122,9 @@ def normalize_timestamp(timestamp_str: str, format_hint: Optional[str] = None) -
     formats found in different log types (Apache, syslog, ISO 8601, etc.).
     Returns timezone-naive datetime objects for consistency across the application.
     
+    Results are memoized: log lines written in the same second share a
+    timestamp string, so strptime runs once per distinct value.
+    
     Args:
         timestamp_str (str): The timestamp string to parse
         format_hint (Optional[str]): Optional format hint to try first
@@ -292,8 +305,9 @@ def format_bytes(bytes_count: int) -> str:
     return f"{bytes_count:.1f} TB"
 
 
-def get_geolocation_info(ip: str) -> Dict[str, Any]:
-    """Get basic geolocation info (placeholder for external service)"""
+@functools.lru_cache(maxsize=100_000)
+def _lookup_geolocation(ip: str) -> Dict[str, Any]:
+    """Look up geolocation info once per IP (results are memoized)"""
     # In a real implementation, this would query a geolocation service
     return {
         'country': 'Unknown',
@@ -301,4 +315,31 @@ def get_geolocation_info(ip: str) -> Dict[str, Any]:
         'asn': 'Unknown',
         'is_tor': False,
         'is_vpn': False
-    }
\ No newline at end of file
+    }
+
+
+def get_geolocation_info(ip: str) -> Dict[str, Any]:
+    """Get basic geolocation info (placeholder for external service)"""
+    # Copy so callers can't modify the cached entry
+    return dict(_lookup_geolocation(ip))
+
+
+def get_geolocation_info_bulk(ips: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get geolocation info for many IP addresses at once
+    
+    Duplicate addresses are looked up only once, and repeated addresses
+    across calls are served from the in-process cache.
+    
+    Args:
+        ips (List[str]): IP addresses to look up
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: Geolocation info keyed by IP address
+    """
+    return {ip: get_geolocation_info(ip) for ip in dict.fromkeys(ips)}
+
+
+def clear_geolocation_cache() -> None:
+    """Forget all memoized geolocation lookups"""
+    _lookup_geolocation.cache_clear()
\ No newline at end of file
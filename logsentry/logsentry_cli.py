@@ -9,6 +9,7 @@ This provides a clean interface for PyInstaller to build executables.
 
 import sys
 import os
+import multiprocessing
 
 # Add the current directory to Python path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -29,4 +30,6 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
+    # Required for process pools (directory scans) in frozen executables
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
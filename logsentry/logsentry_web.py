@@ -9,6 +9,7 @@ This provides a clean interface for PyInstaller to build web executables.
 
 import sys
 import os
+import multiprocessing
 import argparse
 
 # Add the current directory to Python path for imports
@@ -100,4 +101,6 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
+    # Required for process pools (directory scans) in frozen executables
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
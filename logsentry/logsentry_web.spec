@@ -108,6 +108,20 @@ a = Analysis(
         'IPython',
         'jupyter',
         'notebook',
+        # Standard library packages outside the LogSentry import graph;
+        # everything bundled is unpacked on every onefile launch
+        'unittest',
+        'test',
+        'lib2to3',
+        'pydoc_data',
+        'xmlrpc',
+        'curses',
+        'sqlite3',
+        'turtle',
+        'turtledemo',
+        'idlelib',
+        'ensurepip',
+        'venv',
     ],
     noarchive=False,
 )
@@ -126,9 +140,9 @@ exe = EXE(
     name='LogSentry-Web',  # Executable name
     debug=False,  # Set to True for debugging
     bootloader_ignore_signals=False,
-    strip=False,
+    strip=not sys.platform.startswith('win'),  # Strip symbols (no-op on Windows)
     upx=True,  # Compress executable (if UPX is available)
-    upx_exclude=[],
+    upx_exclude=['vcruntime140.dll'],  # UPX-packed runtime DLLs fail to load
     runtime_tmpdir=None,
     console=True,  # Console application (shows server output)
     disable_windowed_traceback=False,
@@ -58,6 +58,13 @@ setup(
             "flake8>=4.0",
             "mypy>=0.900",
         ],
+        "geoip": [
+            "maxminddb>=2.0",
+        ],
+        "fast": [
+            "orjson>=3.6",
+            "rapidgzip>=0.10",
+        ],
     },
     entry_points={
         "console_scripts": [
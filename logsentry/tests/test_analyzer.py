@@ -12,8 +12,8 @@ import tempfile
 import os
 from datetime import datetime
 
-from logsentry.analyzer import LogAnalyzer, merge_analysis_results
-from logsentry.rules import SecurityRules, DetectionRule, Severity
+from logsentry.analyzer import LogAnalyzer, merge_analysis_results, _IncrementalState
+from logsentry.rules import SecurityRules, DetectionRule, Detection, Severity, RuleEngine
 from logsentry.parsers import LogParserManager
 
 
@@ -51,6 +51,32 @@ class TestLogAnalyzer:
         assert any('lfi' in rule or 'directory_traversal' in rule for rule in threat_rules)
         assert any('sql_injection' in rule for rule in threat_rules)
     
+    def test_analyze_text_accepts_lines(self):
+        """Test that analyze_text accepts a list of lines as well as a string"""
+        lines = [
+            "192.168.1.100 - - [10/Oct/2023:13:55:36 +0000] \"GET /index.html HTTP/1.1\" 200 2326",
+            "192.168.1.100 - - [10/Oct/2023:13:55:37 +0000] \"GET /?q=<script>alert(1)</script> HTTP/1.1\" 200 1",
+        ]
+        
+        from_lines = self.analyzer.analyze_text(lines)
+        from_text = self.analyzer.analyze_text("\r\n".join(lines) + "\r\n")
+        
+        assert from_lines.total_lines == from_text.total_lines == 2
+        assert ([(d.rule_name, d.line_number) for d in from_lines.detections] ==
+                [(d.rule_name, d.line_number) for d in from_text.detections])
+    
+    def test_analyze_text_numbers_lines_across_chunks(self):
+        """Test that detection line numbers count from the start of the input, not the chunk"""
+        lines = ["10.0.0.1 - - [10/Oct/2023:13:55:36 +0000] \"GET /index.html HTTP/1.1\" 200 1"] * 5
+        lines[3] = "10.0.0.1 - - [10/Oct/2023:13:55:37 +0000] \"GET /?q=<script>alert(1)</script> HTTP/1.1\" 200 1"
+        
+        self.analyzer.chunk_size = 2
+        result = self.analyzer.analyze_text(lines)
+        
+        assert result.total_lines == 5
+        assert result.detections
+        assert all(d.line_number == 4 for d in result.detections)
+    
     def test_analyze_file_with_temp_file(self):
         """Test analyzing a temporary log file"""
         sample_logs = """192.168.1.100 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 2326
@@ -99,6 +125,84 @@ Oct 10 13:55:39 server security: multiple failed login attempts detected from 20
         finally:
             os.unlink(temp_file)
     
+    def test_analyze_file_mmap_matches_buffered(self, monkeypatch):
+        """Test that memory-mapped reading of large files gives the same result"""
+        import logsentry.analyzer as analyzer_module
+        
+        content = ('10.0.0.1 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 1\r\n'
+                   '10.0.0.2 - - [10/Oct/2023:13:55:37 +0000] "GET /?id=1 UNION SELECT * FROM users HTTP/1.1" 200 1\n'
+                   '\n'
+                   'Oct 10 13:55:38 host sshd[1]: Failed password for root from 10.0.0.3 port 22 ssh2')
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.log', delete=False, newline='') as f:
+            f.write(content)
+            temp_file = f.name
+        
+        try:
+            buffered = self.analyzer.analyze_file(temp_file)
+            
+            monkeypatch.setattr(analyzer_module, '_MMAP_THRESHOLD', 0)
+            monkeypatch.setattr(analyzer_module, '_MMAP_BLOCK_SIZE', 64)
+            mapped = self.analyzer.analyze_file(temp_file)
+            
+            assert mapped.total_lines == buffered.total_lines == 4
+            assert mapped.parsed_lines == buffered.parsed_lines
+            assert ([(d.rule_name, d.line_number) for d in mapped.detections] ==
+                    [(d.rule_name, d.line_number) for d in buffered.detections])
+        finally:
+            os.unlink(temp_file)
+    
+    def test_analyze_file_gzip_reads_lines_across_blocks(self, monkeypatch):
+        """Test that block reading keeps lines intact across block boundaries"""
+        import gzip
+        import logsentry.analyzer as analyzer_module
+        
+        lines = ['10.0.0.1 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 1',
+                 '10.0.0.2 - - [10/Oct/2023:13:55:37 +0000] "GET /?id=1 UNION SELECT * FROM users HTTP/1.1" 200 1',
+                 '',
+                 'Oct 10 13:55:38 host sshd[1]: Failed password for root from 10.0.0.3 port 22 ssh2']
+        
+        with tempfile.NamedTemporaryFile(suffix='.log.gz', delete=False) as f:
+            temp_file = f.name
+        with gzip.open(temp_file, 'wt', newline='') as f:
+            f.write('\r\n'.join(lines))
+        
+        try:
+            monkeypatch.setattr(analyzer_module, '_READ_BLOCK_SIZE', 16)
+            with self.analyzer._open_log(temp_file) as f:
+                assert list(f) == lines
+            
+            result = self.analyzer.analyze_file(temp_file)
+            assert result.total_lines == 4
+            assert any(d.rule_name == 'sql_injection' for d in result.detections)
+        finally:
+            os.unlink(temp_file)
+    
+    def test_analyze_file_skips_optional_passes(self):
+        """Test that IP analysis, geolocation and timeline can be switched off"""
+        sample_logs = """8.8.8.8 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 2326
+8.8.8.8 - - [10/Oct/2023:13:55:37 +0000] "GET /admin/config.php?file=../../../etc/passwd HTTP/1.1" 404 234"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.log', delete=False) as f:
+            f.write(sample_logs)
+            temp_file = f.name
+        
+        try:
+            full = self.analyzer.analyze_file(temp_file)
+            no_geo = self.analyzer.analyze_file(temp_file, include_ip_geo=False)
+            minimal = self.analyzer.analyze_file(
+                temp_file, include_timeline=False, include_ip_analysis=False
+            )
+            
+            assert full.ip_analysis['top_ips'][0]['geolocation']
+            assert no_geo.ip_analysis['top_ips'][0]['geolocation'] == {}
+            assert minimal.ip_analysis['total_unique_ips'] == 0
+            assert minimal.timeline == []
+            assert len(minimal.detections) == len(full.detections)
+            assert minimal.summary['total'] == full.summary['total']
+        finally:
+            os.unlink(temp_file)
+    
     def test_max_lines_limit(self):
         """Test max_lines parameter"""
         sample_logs = "\n".join([
@@ -121,6 +225,108 @@ Oct 10 13:55:39 server security: multiple failed login attempts detected from 20
         finally:
             os.unlink(temp_file)
     
+    def test_analyze_directory_multiple_files(self):
+        """Test analyzing several files in a directory (process pool path)"""
+        sample_logs = """192.168.1.100 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 2326
+192.168.1.100 - - [10/Oct/2023:13:55:37 +0000] "GET /admin/config.php?file=../../../etc/passwd HTTP/1.1" 404 234"""
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ('a.log', 'b.log', 'c.log', 'ignored.txt'):
+                with open(os.path.join(temp_dir, name), 'w') as f:
+                    f.write(sample_logs)
+            # Directories matching the pattern are not log files
+            os.mkdir(os.path.join(temp_dir, 'archive.log'))
+            
+            results = self.analyzer.analyze_directory(temp_dir, "*.log")
+            
+            assert len(results) == 3
+            assert all(r.total_lines == 2 for r in results)
+            assert all(len(r.detections) > 0 for r in results)
+    
+    def test_analyze_file_parallel_matches_serial(self):
+        """Test that splitting a file across workers gives the serial result"""
+        lines = []
+        for i in range(60):
+            if i % 3 == 0:
+                lines.append(f'10.0.0.{i} - - [10/Oct/2023:13:55:36 +0000] "GET /?id=1 UNION SELECT * FROM users HTTP/1.1" 200 1')
+            else:
+                lines.append(f'10.0.0.{i} - - [10/Oct/2023:13:55:36 +0000] "GET /page{i}.html HTTP/1.1" 200 {i}')
+        
+        # Unix, Windows and classic Mac line endings, and a mix of them
+        mixed = ''.join(line + ('\n', '\r\n', '\r')[i % 3] for i, line in enumerate(lines))
+        for content in ('\n'.join(lines), '\r\n'.join(lines), '\r'.join(lines), mixed):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.log', delete=False, newline='') as f:
+                f.write(content)
+                temp_file = f.name
+            
+            try:
+                serial = self.analyzer.analyze_file(temp_file)
+                parallel = self.analyzer.analyze_file_parallel(temp_file, n_workers=4)
+                
+                assert parallel.total_lines == serial.total_lines == 60
+                assert parallel.parsed_lines == serial.parsed_lines
+                assert ([(d.rule_name, d.line_number) for d in parallel.detections] ==
+                        [(d.rule_name, d.line_number) for d in serial.detections])
+                assert parallel.ip_analysis == serial.ip_analysis
+                assert parallel.summary == serial.summary
+            finally:
+                os.unlink(temp_file)
+    
+    def test_geolocation_uses_mmdb_reader(self):
+        """Test that public IPs are geolocated from a configured GeoIP reader"""
+        class FakeReader:
+            lookups = 0
+            
+            def get(self, ip):
+                FakeReader.lookups += 1
+                return {'country': {'iso_code': 'US'}} if ip == '8.8.8.8' else None
+            
+            def close(self):
+                pass
+        
+        self.analyzer._geo_reader = FakeReader()
+        text = """8.8.8.8 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 2326
+1.1.1.1 - - [10/Oct/2023:13:55:37 +0000] "GET /index.html HTTP/1.1" 200 2326"""
+        
+        result = self.analyzer.analyze_text(text)
+        geolocation = {entry['ip']: entry['geolocation'] for entry in result.ip_analysis['top_ips']}
+        
+        assert geolocation['8.8.8.8'] == {'country': {'iso_code': 'US'}}
+        assert geolocation['1.1.1.1'] == {}
+        
+        # Repeat runs are served from the analyzer's cache until it is cleared
+        self.analyzer.analyze_text(text)
+        assert FakeReader.lookups == 2
+        self.analyzer.clear_geo_cache()
+        self.analyzer.analyze_text(text)
+        assert FakeReader.lookups == 4
+    
+    def test_timeline_groups_detections_by_hour(self):
+        """Test that timestamped detections are bucketed by hour in order"""
+        def detection(timestamp, line_number):
+            return Detection(
+                rule_name="sql_injection", severity=Severity.HIGH, description="",
+                matched_text="UNION SELECT", line_number=line_number, timestamp=timestamp,
+                category="web_attack", tags=[]
+            )
+        
+        state = _IncrementalState()
+        state.update([], [
+            detection("2023-10-10 14:05:00", 1),
+            detection("2023-10-10 13:55:36", 2),
+            detection("2023-10-10 13:55:36", 3),
+            detection("not a timestamp", 4),
+        ])
+        timeline = state.sorted_timeline()
+        
+        assert [bucket['timestamp'] for bucket in timeline] == [
+            datetime(2023, 10, 10, 13), datetime(2023, 10, 10, 14)
+        ]
+        assert [bucket['total_detections'] for bucket in timeline] == [2, 1]
+        assert timeline[0]['by_severity'] == {'high': 2}
+        assert timeline[1]['by_category'] == {'web_attack': 1}
+        assert [event['line'] for event in timeline[0]['events']] == [2, 3]
+    
     def test_export_results_json(self):
         """Test exporting results to JSON"""
         text = """192.168.1.1 - - [10/Oct/2023:13:55:36 +0000] "GET /admin/../../../etc/passwd HTTP/1.1" 404 234"""
@@ -142,6 +348,58 @@ Oct 10 13:55:39 server security: multiple failed login attempts detected from 20
         finally:
             os.unlink(output_file)
     
+    def test_export_results_json_values(self):
+        """Test that exported JSON uses plain severity values"""
+        import json
+        
+        text = """192.168.1.1 - - [10/Oct/2023:13:55:36 +0000] "GET /admin/../../../etc/passwd HTTP/1.1" 404 234"""
+        result = self.analyzer.analyze_text(text)
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            output_file = f.name
+        
+        try:
+            self.analyzer.export_results(result, output_file, 'json')
+            
+            with open(output_file, 'r') as f:
+                data = json.load(f)
+            
+            assert data['total_lines'] == 1
+            assert {d['severity'] for d in data['detections']} <= {s.value for s in Severity}
+        finally:
+            os.unlink(output_file)
+    
+    def test_export_results_json_stdlib_timeline(self, monkeypatch):
+        """Test that the stdlib JSON fallback keeps timeline counters intact"""
+        import json
+        import logsentry.analyzer as analyzer_module
+        
+        monkeypatch.setattr(analyzer_module, 'orjson', None)
+        
+        result = self.analyzer.analyze_text("")
+        state = _IncrementalState()
+        state.update([], [Detection(
+            rule_name="sql_injection", severity=Severity.HIGH, description="",
+            matched_text="UNION SELECT", line_number=1, timestamp=datetime(2023, 10, 10, 13, 55),
+            category="web_attack", tags=[]
+        )])
+        result.timeline = state.sorted_timeline()
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            output_file = f.name
+        
+        try:
+            self.analyzer.export_results(result, output_file, 'json')
+            
+            with open(output_file, 'r') as f:
+                data = json.load(f)
+            
+            assert data['timeline'][0]['timestamp'] == "2023-10-10T13:00:00"
+            assert data['timeline'][0]['by_severity'] == {'high': 1}
+            assert data['timeline'][0]['by_category'] == {'web_attack': 1}
+        finally:
+            os.unlink(output_file)
+    
     def test_export_results_csv(self):
         """Test exporting results to CSV"""
         text = """192.168.1.1 - - [10/Oct/2023:13:55:36 +0000] "GET /admin/../../../etc/passwd HTTP/1.1" 404 234"""
@@ -209,6 +467,56 @@ class TestMergeResults:
         assert 'file1.log' in merged['files']
         assert 'file2.log' in merged['files']
         assert len(merged['top_threats_across_files']) > 0
+    
+    def test_merge_results_from_generator(self):
+        """Test that results streamed from a generator merge like a list"""
+        analyzer = LogAnalyzer()
+        
+        results = [
+            analyzer.analyze_text('192.168.1.1 - - [10/Oct/2023:13:55:36 +0000] "GET /?q=<script>alert(1)</script> HTTP/1.1" 200 1', "file1.log"),
+            analyzer.analyze_text('192.168.1.2 - - [10/Oct/2023:13:55:36 +0000] "GET /index.html HTTP/1.1" 200 1', "file2.log"),
+            analyzer.analyze_text('203.0.113.42 - - [10/Oct/2023:13:55:37 +0000] "GET /?id=1 UNION SELECT * FROM users HTTP/1.1" 200 1', "file3.log"),
+        ]
+        
+        assert merge_analysis_results(iter(results)) == merge_analysis_results(results)
+        assert merge_analysis_results(iter([])) == {}
+        assert merge_analysis_results(results)['combined_summary'] == RuleEngine.get_detection_summary(
+            [d for result in results for d in result.detections])
+    
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_merged_export_keeps_str_timestamps(self, monkeypatch, use_orjson):
+        """Test that the scan export writes timeline datetimes as str() does"""
+        import json
+        import logsentry.analyzer as analyzer_module
+    
+        if not use_orjson:
+            monkeypatch.setattr(analyzer_module, 'orjson', None)
+        elif analyzer_module.orjson is None:
+            pytest.skip("orjson is not installed")
+    
+        result = LogAnalyzer().analyze_text("", "file1.log")
+        state = _IncrementalState()
+        state.update([], [Detection(
+            rule_name="sql_injection", severity=Severity.HIGH, description="",
+            matched_text="UNION SELECT", line_number=1, timestamp=datetime(2023, 10, 10, 13, 55),
+            category="web_attack", tags=[]
+        )])
+        result.timeline = state.sorted_timeline()
+        merged = merge_analysis_results([result])
+    
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            output_file = f.name
+    
+        try:
+            analyzer_module.write_json(merged, output_file, default=str)
+    
+            with open(output_file, 'r') as f:
+                data = json.load(f)
+    
+            assert data['timeline'][0]['timestamp'] == "2023-10-10 13:00:00"
+            assert data['timeline'][0]['by_severity'] == {'high': 1}
+        finally:
+            os.unlink(output_file)
 
 
 class TestSpecificThreatDetection:
@@ -279,6 +587,109 @@ class TestSpecificThreatDetection:
             result = self.analyzer.analyze_text(log)
             assert any(d.rule_name == "privileged_escalation" for d in result.detections), f"Failed to detect privilege escalation in: {log}"
 
+    
+    def test_literal_prefilter_matches_full_scan(self):
+        """Test that the substring prefilter never changes rule results"""
+        lines = [
+            "GET /index.html HTTP/1.1 200",
+            "GET /search?q=<SCRIPT>alert(1)</SCRIPT>",
+            "POST /login HTTP/1.1' Or 1=1--",
+            "User-Agent: SQLMAP/1.5",
+            "Oct 10 13:55:38 server SUDO: user executed sudo su - root",
+            "GET /..%2F..%2Fetc/passwd",
+            "connection from 10.0.0.1 to pool.minexmr.com via stratum+tcp",
+            # re.IGNORECASE matches these where casefold() would not ('İ' ~ 'i')
+            "GET /search?q=<scr\u0130pt>alert(1)</scr\u0130pt>",
+            "POST /login HTTP/1.1' UN\u0130ON SELECT password FROM users--",
+            "",
+        ]
+        
+        engine = RuleEngine()
+        unfiltered = RuleEngine()
+        unfiltered.prefilters = {}
+        
+        assert engine.prefilters
+        assert any(d.rule_name == "xss_attempt" for d in engine.analyze_line(lines[7], 1))
+        assert ([(d.rule_name, d.matched_text) for d in engine.analyze_log_chunk(lines)] ==
+                [(d.rule_name, d.matched_text) for d in unfiltered.analyze_log_chunk(lines)])
+
+
+class TestLogParsers:
+    """Test cases for log parser selection and decoding"""
+    
+    def test_parser_dispatch_matches_can_parse_order(self):
+        """Test that the combined dispatch regex picks the same parser as can_parse"""
+        from logsentry.parsers import GenericLogParser
+        
+        lines = [
+            '192.168.1.1 - - [10/Oct/2023:13:55:36 +0000] "GET / HTTP/1.1" 200 512',
+            "<34>Oct 11 22:14:15 host su: 'su root' failed",
+            "Oct 11 22:14:15 host sshd[42]: Failed password from 10.0.0.5",
+            "2023-10-10 13:55:36 Error 4625 12544 An account failed to log on",
+            "Oct 11 22:14:15 fw kernel: IN=eth0 OUT= SRC=1.2.3.4 DST=5.6.7.8 PROTO=TCP SPT=1 DPT=22",
+            '  {"message": "hello", "ip": "1.1.1.1"}  ',
+            "plain text from 172.16.0.1",
+        ]
+        
+        class CustomParser(GenericLogParser):
+            def __init__(self):
+                super().__init__()
+                self.name = "custom"
+            
+            def can_parse(self, line):
+                return line.startswith("plain")
+        
+        manager = LogParserManager()
+        manager.add_parser(CustomParser())
+        
+        for line in lines:
+            expected = next(p for p in manager.parsers if p.can_parse(line))
+            assert manager.parse_line(line).log_type == expected.name, line
+        assert manager.parse_line(lines[-1]).log_type == "custom"
+    
+    def test_parser_dispatch_respects_overridden_can_parse(self):
+        """Test that subclasses overriding can_parse, and direct edits of parsers, are honoured"""
+        from logsentry.parsers import JSONLogParser, SyslogParser
+        
+        class StrictJSONParser(JSONLogParser):
+            def can_parse(self, line):
+                return super().can_parse(line) and '"strict"' in line
+        
+        class LegacyParser(SyslogParser):
+            def __init__(self):
+                super().__init__()
+                self.name = "legacy"
+        
+        manager = LogParserManager()
+        manager.parsers[4] = StrictJSONParser()
+        assert manager.parse_line('{"message": "loose"}').log_type == "generic"
+        assert manager.parse_line('{"strict": true, "message": "x"}').log_type == "json"
+        
+        # Inserted directly rather than through add_parser; it inherits
+        # can_parse and the dispatch pattern together, so it is dispatched
+        manager.parsers.insert(0, LegacyParser())
+        assert manager.parse_line("Oct 11 22:14:15 host sshd[42]: hello").log_type == "legacy"
+    
+    def test_json_parser_matches_stdlib_decoding(self, monkeypatch):
+        """Test that JSON log lines decode the same with and without orjson"""
+        from logsentry import parsers as parsers_module
+        
+        lines = [
+            '{"time": "2023-10-10 13:55:36", "ip": "10.0.0.1", "msg": "login failed", "n": 3}',
+            '{"message": "value", "ratio": NaN}',
+            '{"message": "broken"',
+        ]
+        
+        def parse_all():
+            manager = LogParserManager()
+            return [(e.log_type, e.timestamp, e.source_ip, e.message, repr(e.fields)) if e else None
+                    for e in map(manager.parse_line, lines)]
+        
+        fast = parse_all()
+        monkeypatch.setattr(parsers_module, 'orjson', None)
+        assert fast == parse_all()
+        assert fast[0][0] == fast[1][0] == "json"
+
 
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file